@@ -1,6 +1,8 @@
 """Build utility functions shared between build.py and other modules."""
 
+import functools
 import os
+from pathlib import Path
 
 
 def find_project_dir(start_dir=None):
@@ -16,20 +18,93 @@ def find_project_dir(start_dir=None):
     if start_dir is None:
         start_dir = os.getcwd()
 
-    current_dir = os.path.abspath(start_dir)
+    return _find_project_dir(os.path.abspath(start_dir))
 
+
+@functools.lru_cache(maxsize=32)
+def _find_project_dir(current_dir):
+    """Walk up from an absolute directory looking for platformio.ini (memoized)."""
     # Start from the current directory and walk up
     search_dir = current_dir
     while search_dir != os.path.dirname(search_dir):  # Stop at filesystem root
         platformio_ini = os.path.join(search_dir, "platformio.ini")
-        if os.path.exists(platformio_ini):
+        try:
+            os.stat(platformio_ini)
             return search_dir
+        except OSError:
+            pass
         search_dir = os.path.dirname(search_dir)
 
     # Fallback: return current directory
     return current_dir
 
 
+# Allow callers (e.g. tests) to reset the lookup cache
+find_project_dir.cache_clear = _find_project_dir.cache_clear
+
+
+def find_registry_json(start_dir):
+    """
+    Search up the directory tree for a workspace's public/registry.json.
+
+    Args:
+        start_dir: Directory to start searching from
+
+    Returns:
+        Path to registry.json, or None if not found within 10 levels
+    """
+    return _find_registry_json(os.path.realpath(start_dir))
+
+
+@functools.lru_cache(maxsize=32)
+def _find_registry_json(search_dir):
+    """Walk up from a resolved directory looking for public/registry.json (memoized)."""
+    # Search up to 10 levels (reasonable limit)
+    for _ in range(10):
+        potential_registry = os.path.join(search_dir, "public", "registry.json")
+        try:
+            os.stat(potential_registry)
+            return Path(potential_registry)
+        except OSError:
+            pass
+
+        parent = os.path.dirname(search_dir)
+        if parent == search_dir:  # Reached filesystem root
+            break
+        search_dir = parent
+
+    return None
+
+
+def iter_plugin_files(root, suffix=None):
+    """
+    Recursively yield files below a directory, skipping hidden directories.
+
+    Uses os.scandir so directory/file type checks come from the cached
+    DirEntry data instead of extra stat calls.
+
+    Args:
+        root: Directory to scan
+        suffix: Only yield files whose name ends with this suffix (e.g. ".proto")
+
+    Yields:
+        os.DirEntry for each file found
+    """
+    try:
+        with os.scandir(root) as it:
+            entries = list(it)
+    except OSError:
+        return
+
+    for entry in entries:
+        if entry.is_dir():
+            # Skip hidden directories and don't follow symlinked directories
+            if not entry.name.startswith(".") and not entry.is_symlink():
+                yield from iter_plugin_files(entry.path, suffix)
+        elif suffix is None or entry.name.endswith(suffix):
+            yield entry
+
+
 def scan_plugins(project_dir):
     """
     Scan for plugins in the project directory.
@@ -43,21 +118,18 @@ def scan_plugins(project_dir):
     plugins_dir_rel = "plugins"
     plugins_dir = os.path.join(project_dir, plugins_dir_rel)
 
-    if not os.path.exists(plugins_dir):
+    try:
+        with os.scandir(plugins_dir) as it:
+            # Linked plugins are symlinks, so follow them when checking for directories
+            plugin_entries = [e for e in it if not e.name.startswith(".") and e.is_dir()]
+    except OSError:
+        # Missing or not a directory
         return []
 
     plugins = []
-    if not os.path.isdir(plugins_dir):
-        return plugins
-
-    plugin_dirs = [
-        d
-        for d in os.listdir(plugins_dir)
-        if os.path.isdir(os.path.join(plugins_dir, d)) and not d.startswith(".")
-    ]
-
-    for plugin_name in plugin_dirs:
-        plugin_path = os.path.join(plugins_dir, plugin_name)
+    for entry in plugin_entries:
+        plugin_name = entry.name
+        plugin_path = entry.path
         src_path = os.path.join(plugin_path, "src")
 
         # Check if plugin has a src directory
@@ -65,15 +137,8 @@ def scan_plugins(project_dir):
             continue
 
         # Scan for .proto files recursively in the plugin directory
-        proto_files = []
-        for root, dirs, files in os.walk(plugin_path):
-            # Skip hidden directories
-            dirs[:] = [d for d in dirs if not d.startswith(".")]
-            for file in files:
-                if file.endswith(".proto"):
-                    proto_files.append(os.path.join(root, file))
+        proto_files = [f.path for f in iter_plugin_files(plugin_path, ".proto")]
 
         plugins.append((plugin_name, plugin_path, src_path, proto_files))
 
     return plugins
-
@@ -2,62 +2,195 @@
 
 import argparse
 import importlib
+import os
 import pkgutil
+import shutil
 import sys
 from pathlib import Path
 
-from mesh_plugin_manager.commands.version import get_mpm_version
+# Arguments that only print the version, answered before any parser is built
+_VERSION_ARGS = ("version", "--version", "-V")
+
+_DESCRIPTION = "Mesh Plugin Manager"
+
+# Arguments that only print top-level help, which can be served from the help cache
+_HELP_ARGS = ((), ("-h",), ("--help",))
 
 
 def _discover_commands():
-    """Discover all command modules and return a dict mapping command name to handler."""
-    commands = {}
+    """Discover command module names without importing them."""
     commands_module = Path(__file__).parent / "commands"
-    
-    # Import all modules in the commands package
-    for _, module_name, _ in pkgutil.iter_modules([str(commands_module)]):
-        if module_name == "__init__":
-            continue
-        
-        try:
-            module = importlib.import_module(f"mesh_plugin_manager.commands.{module_name}")
-            if hasattr(module, "register"):
-                # Store the module for later registration
-                commands[module_name] = module
-        except ImportError as e:
-            # Log import errors for debugging but continue
-            print(f"Warning: Failed to import command '{module_name}': {e}", file=sys.stderr)
-            continue
-        except Exception as e:
-            # Log other errors but continue
-            print(f"Warning: Error loading command '{module_name}': {e}", file=sys.stderr)
+    return [
+        module_name
+        for _, module_name, _ in pkgutil.iter_modules([str(commands_module)])
+        if module_name != "__init__"
+    ]
+
+
+def _select_commands(command_names, argv):
+    """
+    Pick the command modules that need to be imported for this invocation.
+
+    Only the invoked command is imported; help output and unknown commands
+    need every command registered.
+
+    Args:
+        command_names: All available command module names
+        argv: Command-line arguments (without the program name)
+
+    Returns:
+        List of command module names to load
+    """
+    for arg in argv:
+        if arg.startswith("-"):
             continue
-    
-    return commands
+        if arg in command_names:
+            return [arg]
+        break
+    return command_names
+
+
+def _load_command(module_name):
+    """Import a command module, returning None if it can't be loaded."""
+    try:
+        module = importlib.import_module(f"mesh_plugin_manager.commands.{module_name}")
+    except ImportError as e:
+        # Log import errors for debugging but continue
+        print(f"Warning: Failed to import command '{module_name}': {e}", file=sys.stderr)
+        return None
+    except Exception as e:
+        # Log other errors but continue
+        print(f"Warning: Error loading command '{module_name}': {e}", file=sys.stderr)
+        return None
+
+    if not hasattr(module, "register"):
+        return None
+    return module
+
+
+class _VersionedHelpFormatter(argparse.RawDescriptionHelpFormatter):
+    """Help formatter that appends the mpm version to the description when help is shown."""
+
+    def add_text(self, text):
+        if text == _DESCRIPTION:
+            from mesh_plugin_manager.commands.version import get_mpm_version
+
+            text = f"{text} (v{get_mpm_version()})"
+        super().add_text(text)
+
+
+def _print_version():
+    """Print the mpm version."""
+    from mesh_plugin_manager.commands.version import get_mpm_version
+
+    print(get_mpm_version())
+
+
+def _help_cache_path():
+    """Path of the cached top-level help text, or None if there is no safe cache directory."""
+    from mesh_plugin_manager.fs_utils import user_cache_dir
+
+    cache_dir = user_cache_dir()
+    return cache_dir / "help-cache.txt" if cache_dir is not None else None
+
+
+def _help_cache_key():
+    """
+    Build the key the cached help text is valid for.
+
+    Help depends on the program name, terminal width, Python's argparse version, the
+    installed mpm version and the command modules (and, in a source checkout, pyproject.toml).
+
+    Returns:
+        Single-line cache key
+    """
+    from mesh_plugin_manager.commands.version import get_mpm_version
+
+    package_dir = Path(__file__).parent
+    mtimes = [os.stat(__file__).st_mtime_ns]
+    with os.scandir(package_dir / "commands") as it:
+        mtimes.extend(entry.stat().st_mtime_ns for entry in it if entry.name.endswith(".py"))
+    try:
+        mtimes.append(os.stat(package_dir.parent.parent / "pyproject.toml").st_mtime_ns)
+    except OSError:
+        pass
+    prog = os.path.basename(sys.argv[0])
+    columns = shutil.get_terminal_size().columns
+    python_version = f"{sys.version_info[0]}.{sys.version_info[1]}"
+    return f"{prog}|{columns}|{python_version}|{get_mpm_version()}|{max(mtimes)}"
+
+
+def _read_cached_help(key):
+    """Return the cached help text if it was stored under key, else None."""
+    cache_path = _help_cache_path()
+    if cache_path is None:
+        return None
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            cached_key, _, text = f.read().partition("\n")
+    except OSError:
+        return None
+    return text if cached_key == key else None
+
+
+def _write_cached_help(key, text):
+    """Store help text under key, ignoring failures."""
+    cache_path = _help_cache_path()
+    if cache_path is None:
+        return
+    tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(f"{key}\n{text}")
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
 
 
 def main():
     """Main entry point for CLI."""
-    version = get_mpm_version()
+    # Fast path: no parser, no command discovery
+    if len(sys.argv) == 2 and sys.argv[1] in _VERSION_ARGS:
+        _print_version()
+        return
+
+    # Top-level help needs every command module imported; reuse the last rendering instead
+    help_key = None
+    if tuple(sys.argv[1:]) in _HELP_ARGS:
+        help_key = _help_cache_key()
+        cached_help = _read_cached_help(help_key)
+        if cached_help is not None:
+            sys.stdout.write(cached_help)
+            return
+
     parser = argparse.ArgumentParser(
-        description=f"Mesh Plugin Manager (v{version})",
-        formatter_class=argparse.RawDescriptionHelpFormatter,
+        description=_DESCRIPTION,
+        formatter_class=_VersionedHelpFormatter,
     )
+    parser.add_argument("-V", "--version", action="store_true", help="Show the mpm version and exit")
     subparsers = parser.add_subparsers(dest="command", help="Command to execute")
 
-    # Discover and register all commands
+    # Register only the commands needed for this invocation
     command_handlers = {}
-    command_modules = _discover_commands()
-    
-    for module_name, module in command_modules.items():
-        handler = module.register(subparsers)
-        # Map command name (from parser) to handler
+    for module_name in _select_commands(_discover_commands(), sys.argv[1:]):
+        module = _load_command(module_name)
+        if module is None:
+            continue
         # The command name is typically the same as module name
-        command_name = module_name
-        command_handlers[command_name] = handler
+        command_handlers[module_name] = module.register(subparsers)
+
+    if help_key is not None:
+        help_text = parser.format_help()
+        _write_cached_help(help_key, help_text)
+        sys.stdout.write(help_text)
+        return
 
     args = parser.parse_args()
 
+    if args.version:
+        _print_version()
+        sys.exit(0)
+
     if not args.command:
         # Default: show help
         parser.print_help()
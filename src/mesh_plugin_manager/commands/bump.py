@@ -1,13 +1,13 @@
 """Bump command for mpm."""
 
-import json
+import functools
+import os
 import re
 import sys
 from pathlib import Path
 
-import semver
-
-from mesh_plugin_manager.build_utils import find_project_dir
+from mesh_plugin_manager import json_utils
+from mesh_plugin_manager.build_utils import find_registry_json
 
 
 def register(subparsers):
@@ -21,79 +21,105 @@ def register(subparsers):
     return cmd_bump
 
 
+@functools.lru_cache(maxsize=8)
+def _version_pattern(plugin_name):
+    """
+    Compile the pattern for a plugin's version #define.
+
+    Args:
+        plugin_name: Upper-case plugin name used in the macro
+
+    Returns:
+        Compiled bytes pattern with groups (prefix, version, closing quote)
+    """
+    name = re.escape(plugin_name.encode("utf-8"))
+    return re.compile(rb'(#define\s+' + name + rb'_VERSION\s+")(\d+\.\d+\.\d+)(")')
+
+
+def _bump_version(version_str, bump_type):
+    """
+    Bump an X.Y.Z version string.
+
+    Args:
+        version_str: Current version, already matched as three dot-separated integers
+        bump_type: "major", "minor" or "patch"
+
+    Returns:
+        The bumped version string
+    """
+    major, minor, patch = map(int, version_str.split("."))
+    if bump_type == "major":
+        return f"{major + 1}.0.0"
+    if bump_type == "minor":
+        return f"{major}.{minor + 1}.0"
+    return f"{major}.{minor}.{patch + 1}"
+
+
+def _write_atomic(path, data):
+    """
+    Replace a file's contents via a temporary file and rename, so an interrupted bump never
+    leaves plugin.h half-written.
+
+    Args:
+        path: File to replace
+        data: New file contents
+    """
+    tmp_path = path.with_name(path.name + ".tmp")
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except OSError:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
 def cmd_bump(args):
     """Bump plugin version in plugin.h file."""
-    bump_type = args.bump_type.lower()
-
-    if bump_type not in ("major", "minor", "patch"):
-        print(f"Error: Invalid bump type '{bump_type}'. Must be one of: major, minor, patch", file=sys.stderr)
-        sys.exit(1)
+    # argparse restricts bump_type to major, minor or patch
+    bump_type = args.bump_type
 
     # Get current working directory
     cwd = Path.cwd()
 
-    # Look for plugin.h in current directory or src/plugin.h
-    plugin_h_paths = [
-        cwd / "plugin.h",
-        cwd / "src" / "plugin.h",
-    ]
-
-    plugin_h_path = None
-    for path in plugin_h_paths:
-        if path.exists():
-            plugin_h_path = path
-            break
+    # Look for plugin.h in current directory or src/plugin.h, stopping at the first hit
+    plugin_h_path = next(
+        (path for path in (cwd / "plugin.h", cwd / "src" / "plugin.h") if path.exists()),
+        None,
+    )
 
     if not plugin_h_path:
         print("Error: plugin.h not found. Expected plugin.h or src/plugin.h in the current directory.", file=sys.stderr)
         sys.exit(1)
 
-    # Read plugin.h
+    # Read plugin.h as bytes so match offsets are file offsets
     try:
-        with open(plugin_h_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-    except Exception as e:
+        content = plugin_h_path.read_bytes()
+    except OSError as e:
         print(f"Error reading {plugin_h_path}: {e}", file=sys.stderr)
         sys.exit(1)
 
     # Get plugin name from directory name
     plugin_name = cwd.name.upper()
-    version_pattern = rf'#define\s+{plugin_name}_VERSION\s+"(\d+\.\d+\.\d+)"'
+    version_pattern = _version_pattern(plugin_name)
 
     # Find version string
-    match = re.search(version_pattern, content)
+    match = version_pattern.search(content)
     if not match:
         print(f"Error: Could not find {plugin_name}_VERSION in {plugin_h_path}", file=sys.stderr)
         print(f"Expected: #define {plugin_name}_VERSION \"X.Y.Z\"", file=sys.stderr)
         sys.exit(1)
 
-    current_version_str = match.group(1)
+    current_version_str = match.group(2).decode("ascii")
 
     # Parse and bump version
-    try:
-        current_version = semver.Version.parse(current_version_str)
-    except ValueError as e:
-        print(f"Error: Invalid version format '{current_version_str}': {e}", file=sys.stderr)
-        sys.exit(1)
-
-    # Apply bump
-    if bump_type == "major":
-        new_version = current_version.bump_major()
-    elif bump_type == "minor":
-        new_version = current_version.bump_minor()
-    else:  # patch
-        new_version = current_version.bump_patch()
-
-    new_version_str = str(new_version)
-
-    # Replace version in content
-    new_content = content.replace(current_version_str, new_version_str)
+    new_version_str = _bump_version(current_version_str, bump_type)
 
-    # Write updated content
+    # Replace the version in the #define only, leaving other occurrences of the string alone
+    new_version = new_version_str.encode("ascii")
     try:
-        with open(plugin_h_path, 'w', encoding='utf-8') as f:
-            f.write(new_content)
-    except Exception as e:
+        _write_atomic(plugin_h_path, content[:match.start(2)] + new_version + content[match.end(2):])
+    except OSError as e:
         print(f"Error writing {plugin_h_path}: {e}", file=sys.stderr)
         sys.exit(1)
 
@@ -102,34 +128,21 @@ def cmd_bump(args):
 
     # Search up directory tree for registry.json
     plugin_slug = cwd.name.lower()
-    registry_path = None
-    search_dir = cwd.parent
-
-    # Search up to 10 levels (reasonable limit)
-    for _ in range(10):
-        potential_registry = search_dir / "public" / "registry.json"
-        if potential_registry.exists():
-            registry_path = potential_registry
-            break
-        if search_dir == search_dir.parent:  # Reached root
-            break
-        search_dir = search_dir.parent
+    registry_path = find_registry_json(cwd.parent)
 
     if registry_path:
         try:
             # Read registry.json
-            with open(registry_path, 'r', encoding='utf-8') as f:
-                registry_data = json.load(f)
+            registry_data = json_utils.loads(registry_path.read_bytes())
 
             # Update version if plugin entry exists
-            if plugin_slug in registry_data:
+            if plugin_slug in registry_data and registry_data[plugin_slug].get("version") == new_version_str:
+                print(f"  Note: registry.json already lists {plugin_slug} at {new_version_str}")
+            elif plugin_slug in registry_data:
                 registry_data[plugin_slug]["version"] = new_version_str
 
-                # Write back with proper formatting (2 space indent)
-                with open(registry_path, 'w', encoding='utf-8') as f:
-                    json.dump(registry_data, f, indent=2, ensure_ascii=False)
-                    # Add trailing newline for consistency
-                    f.write('\n')
+                # Write back with proper formatting (2 space indent) and a trailing newline
+                json_utils.write_pretty(registry_path, registry_data)
 
                 # Show relative path from workspace root if possible
                 try:
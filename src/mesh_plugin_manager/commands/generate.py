@@ -3,8 +3,6 @@
 import sys
 
 from mesh_plugin_manager.build_utils import find_project_dir, scan_plugins
-from mesh_plugin_manager.modules import generate_dynamic_modules
-from mesh_plugin_manager.proto import generate_all_protobuf_files
 
 
 def register(subparsers):
@@ -15,11 +13,19 @@ def register(subparsers):
         action="store_true",
         help="Show verbose output",
     )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Regenerate protobuf files even if they are newer than their .proto files",
+    )
     return cmd_generate
 
 
 def cmd_generate(args):
     """Generate protobuf files and dynamic modules for all plugins."""
+    from mesh_plugin_manager.modules import generate_dynamic_modules
+    from mesh_plugin_manager.proto import generate_all_protobuf_files
+
     project_dir = find_project_dir()
     plugins = scan_plugins(project_dir)
 
@@ -30,7 +36,7 @@ def cmd_generate(args):
         return
 
     print(f"Generating protobuf files for {len(plugins)} plugin(s)...")
-    success_count, total_count = generate_all_protobuf_files(plugins, verbose=args.verbose)
+    success_count, total_count = generate_all_protobuf_files(plugins, verbose=args.verbose, force=args.force)
 
     print(f"\nCompleted - {success_count}/{total_count} protobuf file(s) generated successfully")
 
@@ -4,7 +4,6 @@ import sys
 from pathlib import Path
 
 from mesh_plugin_manager.build_utils import find_project_dir
-from mesh_plugin_manager.patcher import apply_patch
 
 
 def register(subparsers):
@@ -21,6 +20,8 @@ def register(subparsers):
 
 def cmd_init(args):
     """Initialize firmware for plugin support by applying the patch."""
+    from mesh_plugin_manager.patcher import apply_patch
+
     if args.target:
         project_dir = Path(args.target).resolve()
         if not project_dir.exists():
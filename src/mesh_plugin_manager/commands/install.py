@@ -1,13 +1,25 @@
 """Install command for mpm."""
 
+import argparse
+import os
 import sys
 from pathlib import Path
 
 from mesh_plugin_manager.build_utils import find_project_dir
-from mesh_plugin_manager.installer import PluginInstaller
-from mesh_plugin_manager.manifest import ManifestManager
-from mesh_plugin_manager.registry import RegistryClient
-from mesh_plugin_manager.resolver import DependencyResolver
+
+# Marks plugins that were not requested directly
+_TRANSITIVE = object()
+
+
+def _positive_int(value):
+    """argparse type for counts that must be at least 1."""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: '{value}'")
+    if number < 1:
+        raise argparse.ArgumentTypeError("must be at least 1")
+    return number
 
 
 def register(subparsers):
@@ -23,11 +35,71 @@ def register(subparsers):
         action="store_true",
         help="Interpret plugin arguments as local paths and symlink instead of cloning from git",
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=_positive_int,
+        default=None,
+        help="Number of plugins to clone in parallel (default: CPU count, at most 8)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Download the registry even if the cached copy is current",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Resolve dependencies even if the lockfile already satisfies meshtastic.json",
+    )
     return cmd_install
 
 
+def _lockfile_satisfies(requirements, locked_plugins, installer):
+    """
+    Check whether the lockfile and plugin checkouts already satisfy a set of requirements.
+
+    Follows the dependencies recorded in the lockfile, so transitive plugins are checked too.
+
+    Args:
+        requirements: Dict mapping plugin slugs to version specs
+        locked_plugins: The lockfile's "plugins" table
+        installer: PluginInstaller for the project
+
+    Returns:
+        True if every plugin is installed at a locked version that satisfies its spec
+    """
+    from mesh_plugin_manager.resolver import version_satisfies
+
+    pending = list(requirements.items())
+    checked = set()
+    while pending:
+        slug, spec = pending.pop()
+        # meshtastic is the firmware, not a plugin
+        if slug == "meshtastic" or (slug, spec) in checked:
+            continue
+        checked.add((slug, spec))
+
+        entry = locked_plugins.get(slug)
+        if entry is None or not installer.is_plugin_installed(slug):
+            return False
+        if not entry.get("linked"):
+            if not version_satisfies(entry.get("version", ""), spec):
+                return False
+            if installer.get_plugin_commit(slug) != entry.get("resolved"):
+                return False
+        pending.extend(entry.get("dependencies", {}).items())
+    return True
+
+
 def cmd_install(args):
     """Install plugins."""
+    # Defer the network and resolver stack until install actually runs
+    from mesh_plugin_manager.installer import PluginInstaller
+    from mesh_plugin_manager.manifest import ManifestManager
+    from mesh_plugin_manager.registry import RegistryClient
+    from mesh_plugin_manager.resolver import DependencyResolver
+
     project_dir = find_project_dir()
     manifest = ManifestManager(project_dir)
     installer = PluginInstaller(project_dir)
@@ -51,6 +123,9 @@ def cmd_install(args):
         print("Linking plugins...")
         failed = []
         processed_slugs: set[str] = set()
+        # Lockfile and manifest changes are collected and written once at the end
+        lock_updates = {}
+        manifest_updates = {}
         
         def link_plugin_recursive(plugin_slug: str, local_path: str) -> bool:
             """Recursively link a plugin and its dependencies if they're also being linked."""
@@ -62,6 +137,7 @@ def cmd_install(args):
             if not installer.link_plugin(plugin_slug, local_path):
                 print(f"  ✗ Failed to link {plugin_slug}", file=sys.stderr)
                 return False
+            manifest.invalidate_plugin_manifest(plugin_slug)
             
             processed_slugs.add(plugin_slug)
             
@@ -80,11 +156,11 @@ def cmd_install(args):
                         return False
             
             # Update lockfile with linked plugin entry
-            manifest.update_lockfile_linked_plugin(plugin_slug, local_path, dependencies)
+            lock_updates[plugin_slug] = manifest.linked_lockfile_entry(local_path, dependencies)
             
             # Add to root manifest if it's a top-level plugin
             if plugin_slug in slug_to_path:
-                manifest.add_dependency(plugin_slug, "linked")
+                manifest_updates[plugin_slug] = "linked"
             
             print(f"  ✓ Linked {plugin_slug}")
             return True
@@ -97,6 +173,11 @@ def cmd_install(args):
             if not link_plugin_recursive(plugin_slug, str(local_path.resolve())):
                 failed.append(plugin_path_str)
         
+        # Record whatever was linked, even if some plugins failed
+        with manifest:
+            manifest.update_lockfile_bulk(lock_updates)
+            manifest.add_dependencies_bulk(manifest_updates)
+
         if failed:
             print(f"\nFailed to link {len(failed)} plugin(s)", file=sys.stderr)
             sys.exit(1)
@@ -105,16 +186,6 @@ def cmd_install(args):
         return
 
     # Normal installation flow
-    registry_client = RegistryClient()
-
-    # Fetch registry
-    print("Fetching registry...")
-    try:
-        registry = registry_client.fetch_registry(force_refresh=True)
-    except Exception as e:
-        print(f"Error fetching registry: {e}", file=sys.stderr)
-        sys.exit(1)
-
     # Determine which plugins to install
     if args.plugins:
         # Install specified plugins
@@ -137,6 +208,21 @@ def cmd_install(args):
         print("No plugins to install.")
         return
 
+    # A plain `mpm install` with everything already in place needs neither the registry nor a solve
+    locked_plugins = manifest.read_lockfile().get("plugins", {})
+    if not args.plugins and not args.force and _lockfile_satisfies(plugins_to_install, locked_plugins, installer):
+        print("All plugins are installed at their locked versions.")
+        return
+
+    # Fetch registry
+    print("Fetching registry...")
+    registry_client = RegistryClient()
+    try:
+        registry = registry_client.fetch_registry(force_refresh=True, use_cache=not args.no_cache)
+    except Exception as e:
+        print(f"Error fetching registry: {e}", file=sys.stderr)
+        sys.exit(1)
+
     # Resolve dependencies
     print("Resolving dependencies...")
     resolver = DependencyResolver(registry, project_dir)
@@ -158,57 +244,105 @@ def cmd_install(args):
                 sys.exit(1)
         requirements[slug] = spec
 
+    # Prefer the versions already pinned in the lockfile
+    locked_entries = {
+        slug: entry
+        for slug, entry in locked_plugins.items()
+        if not entry.get("linked") and "version" in entry
+    }
+
     try:
-        resolutions = resolver.resolve(requirements)
+        resolutions = resolver.resolve(requirements, locked=locked_entries)
     except Exception as e:
         print(f"Error resolving dependencies: {e}", file=sys.stderr)
         sys.exit(1)
 
-    print(f"\nResolved {len(resolutions)} plugin(s):")
-    for slug, version in resolutions.items():
-        print(f"  {slug}@{version}")
-
-    # Install plugins
-    print("\nInstalling plugins...")
+    # Build the install plan up front: (slug, version, repo_url, tag), dependencies first
+    plan = []
+    plan_errors = False
     for slug, version in resolutions.items():
+        repo_url = registry.get(slug, {}).get("repo")
         if slug not in registry:
             print(f"Error: Plugin {slug} not found in registry", file=sys.stderr)
-            continue
-
-        plugin_info = registry[slug]
-        repo_url = plugin_info.get("repo")
-        if not repo_url:
+            plan_errors = True
+        elif not repo_url:
             print(f"Error: No repository URL for {slug}", file=sys.stderr)
-            continue
+            plan_errors = True
+        else:
+            plan.append((slug, version, repo_url, f"v{version}"))
 
-        tag = f"v{version}"
+    # Plugins whose checkout already matches the lockfile pin don't need cloning again
+    up_to_date = set()
+    for slug, version, repo_url, _ in plan:
+        entry = locked_plugins.get(slug)
+        if (
+            entry
+            and entry.get("version") == version
+            and entry.get("repo") == repo_url
+            and installer.is_plugin_installed(slug)
+            and installer.get_plugin_commit(slug) == entry.get("resolved")
+        ):
+            up_to_date.add(slug)
 
-        print(f"Installing {slug}@{version}...")
-        if installer.install_plugin(slug, repo_url, version, tag):
-            # Get commit SHA
-            commit_sha = installer.get_plugin_commit(slug)
-            if not commit_sha:
-                commit_sha = tag
+    # Nothing has been touched yet, so bail out before installing a partial set
+    if plan_errors:
+        sys.exit(1)
 
-            # Get dependencies from plugin manifest
-            plugin_manifest = manifest.get_plugin_manifest(slug)
-            dependencies = {}
-            if plugin_manifest:
-                dependencies = plugin_manifest.get("dependencies", {})
+    lines = [f"\nResolved {len(plan)} plugin(s):"]
+    lines.extend(f"  {slug}@{version}" for slug, version, _, _ in plan)
+    sys.stdout.write("\n".join(lines) + "\n")
+
+    jobs = args.jobs if args.jobs is not None else min(8, os.cpu_count() or 1)
+
+    # Install plugins: clones are network-bound and independent, so run them in parallel
+    # and record each result on this thread in plan order. The batch writes the lockfile and
+    # manifest once at the end, and also if the loop is interrupted, so every plugin already
+    # swapped into plugins/ stays recorded.
+    print("\nInstalling plugins...")
+    results = installer.install_plugins_bulk(
+        ((slug, repo_url, version, tag) for slug, version, repo_url, tag in plan if slug not in up_to_date),
+        max_workers=jobs,
+    )
+    with manifest:
+        for slug, version, repo_url, tag in plan:
+            # Each plugin's progress is written in one go once its outcome is known
+            if slug in up_to_date:
+                # The up-to-date check already matched the checkout against the lockfile
+                header = ""
+                ok, commit_sha = True, locked_plugins[slug]["resolved"]
+            else:
+                ok, commit_sha, messages = next(results)
+                # The worker's error output belongs under this plugin's heading
+                header = f"Installing {slug}@{version}...\n" + "".join(f"{message}\n" for message in messages)
+            if ok:
+                manifest.invalidate_plugin_manifest(slug)
 
-            # Update lockfile
-            is_transitive = slug not in plugins_to_install
-            manifest.update_lockfile_plugin(slug, version, repo_url, commit_sha, dependencies, is_transitive)
+                # Fall back to the tag if the commit SHA couldn't be read
+                commit_sha = commit_sha or tag
 
-            # Add to root manifest if it's a direct dependency
-            if slug in plugins_to_install:
-                version_spec = plugins_to_install[slug]
-                if version_spec != version:
-                    version_spec = f"^{version}"  # Use caret for compatible versions
-                manifest.add_dependency(slug, version_spec)
+                # Get dependencies from plugin manifest
+                plugin_manifest = manifest.get_plugin_manifest(slug)
+                dependencies = {}
+                if plugin_manifest:
+                    dependencies = plugin_manifest.get("dependencies", {})
 
-            print(f"  ✓ Installed {slug}@{version}")
-        else:
-            print(f"  ✗ Failed to install {slug}", file=sys.stderr)
+                # Update lockfile
+                direct_spec = plugins_to_install.get(slug, _TRANSITIVE)
+                is_transitive = direct_spec is _TRANSITIVE
+                manifest.update_lockfile_plugin(slug, version, repo_url, commit_sha, dependencies, is_transitive)
+
+                # Add to root manifest if it's a direct dependency
+                if not is_transitive:
+                    # Use caret for compatible versions
+                    manifest.add_dependency(slug, direct_spec if direct_spec == version else f"^{version}")
+
+                if slug in up_to_date:
+                    sys.stdout.write(f"  ✓ {slug}@{version} is already installed\n")
+                else:
+                    sys.stdout.write(f"{header}  ✓ Installed {slug}@{version}\n")
+            else:
+                sys.stdout.write(header)
+                sys.stdout.flush()
+                print(f"  ✗ Failed to install {slug}", file=sys.stderr)
 
     print("\nInstallation complete!")
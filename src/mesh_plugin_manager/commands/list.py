@@ -1,10 +1,12 @@
 """List command for mpm."""
 
 import sys
+from operator import itemgetter
 
 from mesh_plugin_manager.build_utils import find_project_dir, scan_plugins
-from mesh_plugin_manager.manifest import ManifestManager
-from mesh_plugin_manager.registry import RegistryClient
+
+# Shared stand-in for plugins missing from the lockfile; never mutated
+_EMPTY = {}
 
 
 def register(subparsers):
@@ -15,39 +17,49 @@ def register(subparsers):
         action="store_true",
         help="List all available plugins from registry",
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Download the registry even if the cached copy is current (with --all)",
+    )
     return cmd_list
 
 
 def cmd_list(args):
     """List installed or available plugins."""
-    project_dir = find_project_dir()
-    manifest = ManifestManager(project_dir)
-    lockfile = manifest.read_lockfile()
-
     if args.all:
-        # List all plugins from registry
+        from mesh_plugin_manager.registry import RegistryClient
+
+        # List all plugins from registry (no project files needed)
         print("Fetching registry...")
         registry_client = RegistryClient()
         try:
-            registry = registry_client.fetch_registry(force_refresh=True)
-            print(f"\nAvailable plugins ({len(registry)}):")
-            for slug, info in sorted(registry.items()):
-                name = info.get("name", slug)
-                version = info.get("version", "unknown")
-                print(f"  {slug:20} {name:30} v{version}")
+            registry = registry_client.fetch_registry(force_refresh=True, use_cache=not args.no_cache)
+            # Build the whole listing and write it in one go
+            lines = [f"\nAvailable plugins ({len(registry)}):"]
+            lines.extend(
+                f"  {slug:20} {info.get('name', slug):30} v{info.get('version', 'unknown')}"
+                # Slugs are unique, so never fall back to comparing the info dicts
+                for slug, info in sorted(registry.items(), key=itemgetter(0))
+            )
+            sys.stdout.write("\n".join(lines) + "\n")
         except Exception as e:
             print(f"Error fetching registry: {e}", file=sys.stderr)
             sys.exit(1)
     else:
+        from mesh_plugin_manager.manifest import ManifestManager
+
         # List installed plugins
+        project_dir = find_project_dir()
         plugins = scan_plugins(project_dir)
         if not plugins:
             print("No plugins installed.")
             return
 
-        print(f"Installed plugins ({len(plugins)}):")
+        lock_plugins = ManifestManager(project_dir).read_lockfile().get("plugins") or {}
+
+        lines = [f"Installed plugins ({len(plugins)}):"]
         for plugin_name, plugin_path, src_path, proto_files in plugins:
-            version = "unknown"
-            if "plugins" in lockfile and plugin_name in lockfile["plugins"]:
-                version = lockfile["plugins"][plugin_name].get("version", "unknown")
-            print(f"  {plugin_name:20} v{version}")
+            version = lock_plugins.get(plugin_name, _EMPTY).get("version", "unknown")
+            lines.append(f"  {plugin_name:20} v{version}")
+        sys.stdout.write("\n".join(lines) + "\n")
@@ -1,14 +1,16 @@
 """New command for mpm."""
 
-import json
-import os
+import functools
 import re
 import shutil
 import sys
 from datetime import datetime
 from pathlib import Path
 
-from jinja2 import Environment, PackageLoader
+from mesh_plugin_manager import json_utils
+from mesh_plugin_manager.build_utils import find_registry_json
+
+_SLUG_RE = re.compile(r'^[a-z0-9-]+$')
 
 
 def register(subparsers):
@@ -29,9 +31,40 @@ def register(subparsers):
     return cmd_new
 
 
+@functools.lru_cache(maxsize=1)
+def _template_env():
+    """
+    Build the Jinja2 environment for the plugin templates.
+
+    Compiled templates are kept in Jinja2's per-user bytecode cache, so later runs skip
+    parsing them. Jinja2 is only imported once a plugin is rendered.
+
+    Returns:
+        Configured jinja2.Environment
+    """
+    from jinja2 import Environment, FileSystemBytecodeCache, PackageLoader
+
+    try:
+        # The default directory is private to the user and its ownership is checked
+        bytecode_cache = FileSystemBytecodeCache()
+    except (OSError, RuntimeError):
+        bytecode_cache = None
+    return Environment(
+        loader=PackageLoader("mesh_plugin_manager", "templates"),
+        auto_reload=False,
+        bytecode_cache=bytecode_cache,
+    )
+
+
 def cmd_new(args):
     """Create a new plugin."""
     plugin_slug = args.name.lower()
+
+    # Validate plugin slug before creating or removing anything
+    if not _SLUG_RE.match(plugin_slug):
+        print(f"Error: Plugin slug must contain only lowercase letters, numbers, and hyphens", file=sys.stderr)
+        sys.exit(1)
+
     plugin_name = _slug_to_name(plugin_slug)
     plugin_name_upper = plugin_name.upper()
     
@@ -40,40 +73,23 @@ def cmd_new(args):
     # Determine destination directory
     if args.destination:
         dest_dir = Path(args.destination).resolve()
-        if dest_dir.exists():
-            if not dest_dir.is_dir():
-                print(f"Error: Destination '{args.destination}' exists but is not a directory", file=sys.stderr)
-                sys.exit(1)
-        else:
-            # Create the destination directory if it doesn't exist
-            print(f"Creating destination directory '{args.destination}'...")
-            dest_dir.mkdir(parents=True, exist_ok=True)
+        if dest_dir.exists() and not dest_dir.is_dir():
+            print(f"Error: Destination '{args.destination}' exists but is not a directory", file=sys.stderr)
+            sys.exit(1)
     else:
         dest_dir = cwd
     
     plugin_dir = dest_dir / plugin_slug
     
     # Check if directory already exists
-    if plugin_dir.exists():
-        if args.force:
-            print(f"Removing existing directory '{plugin_slug}'...")
-            shutil.rmtree(plugin_dir)
-        else:
-            print(f"Error: Directory '{plugin_slug}' already exists. Use --force to overwrite.", file=sys.stderr)
-            sys.exit(1)
-    
-    # Validate plugin slug
-    if not re.match(r'^[a-z0-9-]+$', plugin_slug):
-        print(f"Error: Plugin slug must contain only lowercase letters, numbers, and hyphens", file=sys.stderr)
+    if plugin_dir.exists() and not args.force:
+        print(f"Error: Directory '{plugin_slug}' already exists. Use --force to overwrite.", file=sys.stderr)
         sys.exit(1)
     
-    # Create directory structure
-    plugin_dir.mkdir()
     src_dir = plugin_dir / "src"
-    src_dir.mkdir()
     
     # Load Jinja2 templates
-    env = Environment(loader=PackageLoader("mesh_plugin_manager", "templates"))
+    env = _template_env()
     plugin_slug_cpp = _slug_to_cpp_identifier(plugin_slug)
     plugin_slug_snake_upper = _slug_to_snake_case_upper(plugin_slug)
     template_context = {
@@ -87,37 +103,40 @@ def cmd_new(args):
         "release_date": datetime.now().strftime("%Y-%m-%d"),
     }
     
-    # Create plugin.h
-    plugin_h_template = env.get_template("plugin.h.j2")
-    (src_dir / "plugin.h").write_text(plugin_h_template.render(**template_context))
-    
-    # Create module header file
-    module_h_template = env.get_template("Module.h.j2")
-    (src_dir / f"{plugin_name}Module.h").write_text(module_h_template.render(**template_context))
-    
-    # Create module implementation file
-    module_cpp_template = env.get_template("Module.cpp.j2")
-    (src_dir / f"{plugin_name}Module.cpp").write_text(module_cpp_template.render(**template_context))
-    
-    # Create diagnostics.cpp
-    diagnostics_cpp_template = env.get_template("diagnostics.cpp.j2")
-    (src_dir / "diagnostics.cpp").write_text(diagnostics_cpp_template.render(**template_context))
-    
-    # Create README.md
-    readme_template = env.get_template("README.md.j2")
-    (plugin_dir / "README.md").write_text(readme_template.render(**template_context))
-    
-    # Create .gitignore
-    gitignore_template = env.get_template(".gitignore.j2")
-    (plugin_dir / ".gitignore").write_text(gitignore_template.render(**template_context))
+    # Render every file before touching the filesystem, so a template error leaves nothing
+    # created and no existing plugin removed
+    outputs = [
+        (dest, env.get_template(template_name).render(**template_context))
+        for template_name, dest in (
+            ("plugin.h.j2", src_dir / "plugin.h"),
+            ("Module.h.j2", src_dir / f"{plugin_name}Module.h"),
+            ("Module.cpp.j2", src_dir / f"{plugin_name}Module.cpp"),
+            ("diagnostics.cpp.j2", src_dir / "diagnostics.cpp"),
+            ("README.md.j2", plugin_dir / "README.md"),
+            (".gitignore.j2", plugin_dir / ".gitignore"),
+            ("LICENSE.j2", plugin_dir / "LICENSE"),
+            ("CHANGELOG.md.j2", plugin_dir / "CHANGELOG.md"),
+        )
+    ]
+    
+    if not dest_dir.exists():
+        # Create the destination directory if it doesn't exist
+        print(f"Creating destination directory '{args.destination}'...")
+        dest_dir.mkdir(parents=True, exist_ok=True)
     
-    # Create LICENSE
-    license_template = env.get_template("LICENSE.j2")
-    (plugin_dir / "LICENSE").write_text(license_template.render(**template_context))
+    if plugin_dir.exists():
+        print(f"Removing existing directory '{plugin_slug}'...")
+        shutil.rmtree(plugin_dir)
     
-    # Create CHANGELOG.md
-    changelog_template = env.get_template("CHANGELOG.md.j2")
-    (plugin_dir / "CHANGELOG.md").write_text(changelog_template.render(**template_context))
+    # Create directory structure and write the files, removing the partial plugin on failure
+    try:
+        src_dir.mkdir(parents=True)
+        for dest, content in outputs:
+            dest.write_text(content)
+    except OSError as e:
+        shutil.rmtree(plugin_dir, ignore_errors=True)
+        print(f"Error creating plugin '{plugin_slug}': {e}", file=sys.stderr)
+        sys.exit(1)
     
     # Show relative path from cwd for user feedback
     try:
@@ -128,12 +147,11 @@ def cmd_new(args):
         print(f"Created plugin '{plugin_slug}' in {plugin_dir}")
     
     # Search up for registry.json
-    registry_path = _find_registry_json(cwd)
+    registry_path = find_registry_json(cwd)
     if registry_path:
         try:
             # Read registry.json
-            with open(registry_path, 'r', encoding='utf-8') as f:
-                registry_data = json.load(f)
+            registry_data = json_utils.loads(registry_path.read_bytes())
             
             # Add plugin entry
             registry_data[plugin_slug] = {
@@ -146,9 +164,7 @@ def cmd_new(args):
             }
             
             # Write back
-            with open(registry_path, 'w', encoding='utf-8') as f:
-                json.dump(registry_data, f, indent=2, ensure_ascii=False)
-                f.write('\n')
+            json_utils.write_pretty(registry_path, registry_data)
             
             # Show relative path
             try:
@@ -185,22 +201,3 @@ def _slug_to_snake_case_upper(slug):
     # Replace hyphens with underscores and convert to uppercase
     return slug.replace('-', '_').upper()
 
-
-def _find_registry_json(start_dir):
-    """Search up directory tree for mesh-forge/public/registry.json."""
-    search_dir = Path(start_dir).resolve()
-    
-    # Search up to 10 levels (reasonable limit)
-    for _ in range(10):
-        potential_registry = search_dir / "public" / "registry.json"
-        if potential_registry.exists():
-            return potential_registry
-        
-        # Check if we've reached the root
-        parent = search_dir.parent
-        if parent == search_dir:  # Reached filesystem root
-            break
-        search_dir = parent
-    
-    return None
-
@@ -3,8 +3,6 @@
 import sys
 
 from mesh_plugin_manager.build_utils import find_project_dir
-from mesh_plugin_manager.installer import PluginInstaller
-from mesh_plugin_manager.manifest import ManifestManager
 
 
 def register(subparsers):
@@ -16,10 +14,12 @@ def register(subparsers):
 
 def cmd_remove(args):
     """Remove a plugin."""
+    from mesh_plugin_manager.installer import PluginInstaller
+    from mesh_plugin_manager.manifest import ManifestManager
+
     project_dir = find_project_dir()
     manifest = ManifestManager(project_dir)
     installer = PluginInstaller(project_dir)
-    lockfile = manifest.read_lockfile()
 
     plugin_slug = args.plugin
 
@@ -29,14 +29,7 @@ def cmd_remove(args):
         return
 
     # Check if other plugins depend on this one
-    dependents = []
-    if "plugins" in lockfile:
-        for slug, plugin_data in lockfile["plugins"].items():
-            if slug == plugin_slug:
-                continue
-            deps = plugin_data.get("dependencies", {})
-            if plugin_slug in deps:
-                dependents.append(slug)
+    dependents = sorted(manifest.reverse_deps().get(plugin_slug, set()) - {plugin_slug})
 
     if dependents:
         print(f"Error: Cannot remove {plugin_slug}. The following plugins depend on it:")
@@ -46,11 +39,14 @@ def cmd_remove(args):
 
     # Remove plugin
     if installer.remove_plugin(plugin_slug):
-        # Remove from manifest if it's a direct dependency
-        manifest.remove_dependency(plugin_slug)
+        manifest.invalidate_plugin_manifest(plugin_slug)
+
+        with manifest:
+            # Remove from manifest if it's a direct dependency
+            manifest.remove_dependency(plugin_slug)
 
-        # Remove from lockfile
-        manifest.remove_lockfile_plugin(plugin_slug)
+            # Remove from lockfile
+            manifest.remove_lockfile_plugin(plugin_slug)
 
         print(f"Removed {plugin_slug}")
     else:
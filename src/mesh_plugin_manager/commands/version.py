@@ -1,8 +1,13 @@
 """Version command for mpm."""
 
-import tomllib
+import functools
+import re
 from pathlib import Path
 
+# version = "..." inside the [project] table, before any array or other table starts.
+# Anything fancier falls back to a full TOML parse.
+_PROJECT_VERSION_RE = re.compile(rb'^\[project\][^\[]*?^version\s*=\s*"([^"\n]+)"', re.MULTILINE | re.DOTALL)
+
 
 def register(subparsers):
     """Register the version command."""
@@ -10,26 +15,38 @@ def register(subparsers):
     return cmd_version
 
 
+@functools.lru_cache(maxsize=1)
 def get_mpm_version():
     """Get the version of mesh-plugin-manager from pyproject.toml or installed package."""
-    # First, try to read from pyproject.toml (development mode)
     # Find pyproject.toml relative to this package
     # Package is at vendor/mpm/src/mesh_plugin_manager/
     # pyproject.toml is at vendor/mpm/pyproject.toml
+    # It only exists in a source checkout, where it is the authority (installed
+    # metadata may belong to a different copy of mpm)
     package_dir = Path(__file__).parent.parent.parent.parent
     pyproject_path = package_dir / "pyproject.toml"
 
-    if pyproject_path.exists():
+    try:
+        with open(pyproject_path, "rb") as f:
+            content = f.read()
+    except OSError:
+        content = None
+
+    if content is not None:
+        # Cheap scan first; it covers the usual layout of our own pyproject.toml
+        match = _PROJECT_VERSION_RE.search(content)
+        if match:
+            return match.group(1).decode("utf-8")
         try:
-            with open(pyproject_path, "rb") as f:
-                data = tomllib.load(f)
-                version = data.get("project", {}).get("version")
-                if version:
-                    return version
+            import tomllib
+
+            version = tomllib.loads(content.decode("utf-8")).get("project", {}).get("version")
+            if version:
+                return version
         except Exception:
             pass
 
-    # Fallback: try to get from installed package metadata
+    # Installed package: read the version from its metadata
     try:
         from importlib.metadata import version as get_package_version
         return get_package_version("mesh-plugin-manager")
@@ -0,0 +1,75 @@
+"""Filesystem helpers shared across mpm modules."""
+
+import atexit
+import concurrent.futures
+import os
+import shutil
+import stat
+import threading
+import uuid
+from pathlib import Path
+from typing import Optional
+
+# Single worker that deletes stale directories off the critical path
+_cleanup_pool: Optional[concurrent.futures.ThreadPoolExecutor] = None
+_cleanup_pool_lock = threading.Lock()
+
+
+def remove_tree_in_background(path: Path) -> None:
+    """
+    Move a directory out of the way and delete it in a background thread.
+
+    The rename is atomic, so the path can be reused immediately. The directory is
+    renamed to a hidden sibling so plugin scans skip it while it is being deleted.
+    Pending deletions are finished at interpreter exit.
+
+    Args:
+        path: Directory to remove (missing directories are ignored)
+    """
+    global _cleanup_pool
+    doomed = path.with_name(f".{path.name}.old.{uuid.uuid4().hex}")
+    try:
+        os.rename(path, doomed)
+    except FileNotFoundError:
+        return
+    except OSError:
+        # Could not move it aside, delete in place
+        shutil.rmtree(path, ignore_errors=True)
+        return
+
+    with _cleanup_pool_lock:
+        if _cleanup_pool is None:
+            _cleanup_pool = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+            atexit.register(_cleanup_pool.shutdown, wait=True)
+        _cleanup_pool.submit(shutil.rmtree, doomed, ignore_errors=True)
+
+
+def user_cache_dir() -> Optional[Path]:
+    """
+    Return mpm's per-user cache directory, creating it if needed.
+
+    Uses $XDG_CACHE_HOME (default ~/.cache) on POSIX and %LOCALAPPDATA% on Windows.
+    The directory is created private to the user, and one owned by another user is
+    rejected so nobody else can plant cache entries.
+
+    Returns:
+        Cache directory, or None if no safe directory is available
+    """
+    if os.name == "nt":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser(r"~\AppData\Local")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME", "")
+        # Relative XDG paths are invalid and must be ignored
+        if not os.path.isabs(base):
+            base = os.path.expanduser("~/.cache")
+    cache_dir = Path(base) / "mpm"
+    try:
+        cache_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+        st = os.lstat(cache_dir)
+    except OSError:
+        return None
+    if not stat.S_ISDIR(st.st_mode):
+        return None
+    if hasattr(os, "getuid") and st.st_uid != os.getuid():
+        return None
+    return cache_dir
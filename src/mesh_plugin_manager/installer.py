@@ -1,11 +1,61 @@
 """Plugin installer for cloning and managing plugin repositories."""
 
+import concurrent.futures
 import os
+import re
 import shutil
+import stat
 import subprocess
 import sys
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+from mesh_plugin_manager.fs_utils import remove_tree_in_background
+
+_SHA_RE = re.compile(r"[0-9a-f]{40}(?:[0-9a-f]{24})?")
+
+
+def _read_head_sha(plugin_dir: Path) -> Optional[str]:
+    """
+    Resolve HEAD of a git checkout by reading its files instead of running git.
+
+    Handles a detached HEAD, loose refs and packed-refs, and .git files that point to
+    the real git directory.
+
+    Args:
+        plugin_dir: Root of the checkout
+
+    Returns:
+        Commit SHA, or None if it can't be determined this way
+    """
+    git_dir = plugin_dir / ".git"
+    try:
+        if git_dir.is_file():
+            gitdir = git_dir.read_text(encoding="utf-8").strip()
+            if not gitdir.startswith("gitdir:"):
+                return None
+            git_dir = plugin_dir / gitdir[len("gitdir:"):].strip()
+
+        head = (git_dir / "HEAD").read_text(encoding="utf-8").strip()
+        if _SHA_RE.fullmatch(head):
+            return head
+        if not head.startswith("ref: "):
+            return None
+        ref = head[len("ref: "):]
+
+        try:
+            sha = (git_dir / ref).read_text(encoding="utf-8").strip()
+            return sha if _SHA_RE.fullmatch(sha) else None
+        except FileNotFoundError:
+            pass
+        with open(git_dir / "packed-refs", "r", encoding="utf-8") as f:
+            for line in f:
+                sha, _, name = line.rstrip("\n").partition(" ")
+                if name == ref and _SHA_RE.fullmatch(sha):
+                    return sha
+    except OSError:
+        pass
+    return None
 
 
 class PluginInstaller:
@@ -27,7 +77,9 @@ class PluginInstaller:
         repo_url: str,
         version: str,
         tag: Optional[str] = None,
-    ) -> bool:
+        log: Callable[[str], None] = print,
+        expected_sha: Optional[str] = None,
+    ) -> Tuple[bool, Optional[str]]:
         """
         Install a plugin by cloning its repository.
 
@@ -36,42 +88,103 @@ class PluginInstaller:
             repo_url: Git repository URL
             version: Version to install
             tag: Git tag/commit to checkout (defaults to v{version})
+            log: Receives error messages (prints them by default)
+            expected_sha: Commit the tag is known to point to (e.g. from the lockfile); an
+                existing checkout already at it is kept without cloning
 
         Returns:
-            True if successful, False otherwise
+            Tuple of (success, commit SHA of the checkout or None if it couldn't be read)
         """
         if tag is None:
             tag = f"v{version}"
 
         plugin_dir = self.plugins_dir / plugin_slug
 
-        # Remove existing installation if present
-        if plugin_dir.exists():
-            shutil.rmtree(plugin_dir)
+        # An existing checkout already at the expected commit needs no clone
+        if expected_sha and not plugin_dir.is_symlink() and (plugin_dir / "src").is_dir():
+            if self._head_commit(plugin_dir) == expected_sha:
+                return True, expected_sha
+
+        # Clone next to the final location (hidden, so plugin scans skip it) and swap it in,
+        # so a failed clone leaves any existing installation untouched
+        staging_dir = self.plugins_dir / f".{plugin_slug}.new.{os.getpid()}"
+        if os.path.lexists(staging_dir):
+            shutil.rmtree(staging_dir)
 
         # Create plugins directory if needed
         self.plugins_dir.mkdir(parents=True, exist_ok=True)
 
         try:
-            # Clone repository
-            clone_cmd = ["git", "clone", "--depth", "1", "--branch", tag, repo_url, str(plugin_dir)]
+            # Clone just the release: tip commit of the tag, without other branches or tags
+            clone_cmd = [
+                "git", "clone", "--depth", "1", "--single-branch", "--no-tags",
+                "--branch", tag, repo_url, str(staging_dir),
+            ]
             result = subprocess.run(clone_cmd, check=True, capture_output=True, text=True)
-
-            # Verify plugin has src directory
-            src_dir = plugin_dir / "src"
-            if not src_dir.exists() or not src_dir.is_dir():
-                shutil.rmtree(plugin_dir)
-                return False
-
-            return True
         except subprocess.CalledProcessError as e:
             # Cleanup on failure
-            if plugin_dir.exists():
-                shutil.rmtree(plugin_dir)
-            print(f"Error cloning {plugin_slug}: {e}")
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            log(f"Error cloning {plugin_slug}: {e}")
             if e.stderr:
-                print(e.stderr)
-            return False
+                log(e.stderr)
+            return False, None
+
+        # Verify plugin has src directory
+        if not (staging_dir / "src").is_dir():
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            return False, None
+
+        commit_sha = self._head_commit(staging_dir)
+
+        # Move the previous installation aside and delete it off the install path
+        try:
+            if plugin_dir.is_symlink():
+                plugin_dir.unlink()
+            else:
+                remove_tree_in_background(plugin_dir)
+            # Fails if the old directory could only be partly removed
+            os.rename(staging_dir, plugin_dir)
+        except OSError as e:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            log(f"Error installing {plugin_slug}: {e}")
+            return False, None
+        return True, commit_sha
+
+    def install_plugins_bulk(
+        self,
+        specs: Iterable[Tuple[str, str, str, Optional[str]]],
+        max_workers: Optional[int] = None,
+    ) -> Iterator[Tuple[bool, Optional[str], List[str]]]:
+        """
+        Install several plugins, cloning them in parallel.
+
+        Clones are network-bound and independent, so they run on a thread pool. Results
+        are yielded in the order of specs as soon as each one (and those before it) is done.
+        Workers don't print; each plugin's messages are returned with its result so the
+        caller can print them without interleaving.
+
+        Args:
+            specs: (plugin_slug, repo_url, version, tag) for each plugin to install
+            max_workers: Number of concurrent clones (defaults to CPU count, at most 8)
+
+        Returns:
+            Iterator of (success, commit SHA, messages) per plugin, in the order of specs
+        """
+        specs = list(specs)
+        if not specs:
+            return
+        if max_workers is None:
+            max_workers = min(8, os.cpu_count() or 1)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(specs)))) as executor:
+            yield from executor.map(self._install_collecting_messages, specs)
+
+    def _install_collecting_messages(
+        self, spec: Tuple[str, str, str, Optional[str]]
+    ) -> Tuple[bool, Optional[str], List[str]]:
+        """Run install_plugin for one bulk spec, returning its messages instead of printing them."""
+        messages: List[str] = []
+        success, commit_sha = self.install_plugin(*spec, log=messages.append)
+        return success, commit_sha, messages
 
     def remove_plugin(self, plugin_slug: str) -> bool:
         """
@@ -107,7 +220,14 @@ class PluginInstaller:
         plugin_dir = self.plugins_dir / plugin_slug
         if not plugin_dir.exists():
             return None
+        return self._head_commit(plugin_dir)
 
+    @staticmethod
+    def _head_commit(plugin_dir: Path) -> Optional[str]:
+        """Get the commit SHA checked out in a plugin directory, or None."""
+        sha = _read_head_sha(plugin_dir)
+        if sha is not None:
+            return sha
         try:
             result = subprocess.run(
                 ["git", "rev-parse", "HEAD"],
@@ -131,41 +251,45 @@ class PluginInstaller:
         Returns:
             True if successful, False otherwise
         """
-        local_path_obj = Path(local_path)
-        
-        # Validate local path exists and is a directory
-        if not local_path_obj.exists():
+        # Validate local path exists and is a directory (one stat each for it and its src)
+        try:
+            local_is_dir = stat.S_ISDIR(os.stat(local_path).st_mode)
+        except OSError:
             print(f"Error: Path does not exist: {local_path}", file=sys.stderr)
             return False
         
-        if not local_path_obj.is_dir():
+        if not local_is_dir:
             print(f"Error: Path is not a directory: {local_path}", file=sys.stderr)
             return False
         
         # Validate src directory exists
-        src_dir = local_path_obj / "src"
-        if not src_dir.exists() or not src_dir.is_dir():
+        try:
+            src_is_dir = stat.S_ISDIR(os.stat(os.path.join(local_path, "src")).st_mode)
+        except OSError:
+            src_is_dir = False
+        if not src_is_dir:
             print(f"Error: Plugin directory must contain a 'src' directory: {local_path}", file=sys.stderr)
             return False
         
         plugin_dir = self.plugins_dir / plugin_slug
         
         # Remove existing installation if present
-        if plugin_dir.exists():
-            if plugin_dir.is_symlink():
-                plugin_dir.unlink()
-            else:
+        try:
+            existing_mode = os.lstat(plugin_dir).st_mode
+        except FileNotFoundError:
+            existing_mode = None
+        if existing_mode is not None:
+            if stat.S_ISDIR(existing_mode):
                 shutil.rmtree(plugin_dir)
+            else:
+                os.unlink(plugin_dir)
         
         # Create plugins directory if needed
         self.plugins_dir.mkdir(parents=True, exist_ok=True)
         
         try:
-            # Convert to absolute path for symlink
-            absolute_local_path = local_path_obj.resolve()
-            
-            # Create symlink
-            plugin_dir.symlink_to(absolute_local_path)
+            # Symlink to the absolute path of the plugin
+            os.symlink(os.path.realpath(local_path), plugin_dir, target_is_directory=True)
             
             return True
         except OSError as e:
@@ -182,7 +306,9 @@ class PluginInstaller:
         Returns:
             True if installed, False otherwise
         """
-        plugin_dir = self.plugins_dir / plugin_slug
-        src_dir = plugin_dir / "src"
-        return plugin_dir.exists() and src_dir.exists() and src_dir.is_dir()
+        # A single stat of src covers the plugin directory existing too
+        try:
+            return stat.S_ISDIR(os.stat(self.plugins_dir / plugin_slug / "src").st_mode)
+        except OSError:
+            return False
 
@@ -0,0 +1,63 @@
+"""JSON helpers that use orjson when it is available."""
+
+import json
+from pathlib import Path
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:
+    # orjson is an optional speedup; fall back to the stdlib encoder/decoder
+    orjson = None
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """
+    Parse a JSON document.
+
+    Args:
+        data: Raw JSON bytes or text
+
+    Returns:
+        Parsed JSON value
+
+    Raises:
+        json.JSONDecodeError: If the document is not valid JSON or not valid UTF-8
+    """
+    if orjson is not None:
+        # orjson.JSONDecodeError subclasses json.JSONDecodeError, for bad UTF-8 too
+        return orjson.loads(data)
+    try:
+        return json.loads(data)
+    except UnicodeDecodeError as e:
+        # The stdlib decodes bytes before parsing; report bad encoding like any other malformed input
+        raise json.JSONDecodeError(f"Invalid UTF-8: {e.reason}", "", e.start) from e
+
+
+def dumps(data: Any) -> bytes:
+    """
+    Serialize a value to UTF-8 encoded JSON indented with 2 spaces.
+
+    Non-ASCII characters are written as UTF-8 rather than \\u escapes, like the
+    manifest and registry.json writers always did.
+
+    Args:
+        data: Value to serialize
+
+    Returns:
+        Encoded JSON bytes
+    """
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+def write_pretty(path: Union[str, Path], data: Any) -> None:
+    """
+    Write a value to a file as 2-space indented JSON with a trailing newline.
+
+    Args:
+        path: File to write
+        data: Value to serialize
+    """
+    Path(path).write_bytes(dumps(data) + b"\n")
@@ -1,9 +1,33 @@
 """Manifest file management for meshtastic.json and meshtastic-lock.json."""
 
-import json
+import copy
 import os
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Set, Tuple
+
+from mesh_plugin_manager import json_utils
+
+
+def _write_json_atomic(path: Path, data: Dict[str, Any]) -> None:
+    """
+    Write JSON to a file via a temporary file and rename, so readers never see a partial file.
+
+    The file is left untouched if it already holds exactly this content.
+
+    Args:
+        path: Destination file
+        data: Data to serialize (2-space indent)
+    """
+    content = json_utils.dumps(data)
+    try:
+        if path.read_bytes() == content:
+            return
+    except OSError:
+        pass
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
 
 
 class ManifestManager:
@@ -19,19 +43,57 @@ class ManifestManager:
         self.project_dir = Path(project_dir)
         self.manifest_path = self.project_dir / "meshtastic.json"
         self.lockfile_path = self.project_dir / "meshtastic-lock.json"
+        # Parsed plugin manifests by slug, with the (inode, mtime, size) they were read at
+        self._plugin_manifest_cache: Dict[str, Tuple[Tuple[int, int, int], Dict[str, Any]]] = {}
+        # Dependency slug -> slugs of lockfile plugins that depend on it, rebuilt after lockfile writes
+        self._reverse_deps: Optional[Dict[str, Set[str]]] = None
+        # Parsed meshtastic.json / meshtastic-lock.json, loaded on first read
+        self._manifest: Optional[Dict[str, Any]] = None
+        self._lockfile: Optional[Dict[str, Any]] = None
+        # Inside `with manager:` writes only mark the data dirty; it is written once on exit
+        self._batch_depth = 0
+        self._manifest_dirty = False
+        self._lockfile_dirty = False
+
+    def __enter__(self) -> "ManifestManager":
+        """Start batching manifest and lockfile writes until the outermost block exits."""
+        self._batch_depth += 1
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        """Write whatever changed inside the batch."""
+        self._batch_depth -= 1
+        if self._batch_depth == 0:
+            self.flush()
+        return False
+
+    def flush(self) -> None:
+        """Write the manifest and lockfile if they were changed during a batch."""
+        if self._manifest_dirty:
+            _write_json_atomic(self.manifest_path, self._manifest)
+            self._manifest_dirty = False
+        if self._lockfile_dirty:
+            _write_json_atomic(self.lockfile_path, self._lockfile)
+            self._lockfile_dirty = False
+
+    def _manifest_data(self) -> Dict[str, Any]:
+        """Return the cached root manifest, loading it on first use. Callers must not leak it."""
+        if self._manifest is None:
+            if not self.manifest_path.exists():
+                self._manifest = {"name": "meshtastic-firmware", "plugins": {}}
+            else:
+                self._manifest = json_utils.loads(self.manifest_path.read_bytes())
+        return self._manifest
 
     def read_manifest(self) -> Dict[str, Any]:
         """
         Read the root meshtastic.json file.
 
         Returns:
-            Dict containing manifest data, or empty dict with defaults if file doesn't exist
+            Copy of the manifest data (editing it changes nothing until written back),
+            or empty dict with defaults if file doesn't exist
         """
-        if not self.manifest_path.exists():
-            return {"name": "meshtastic-firmware", "plugins": {}}
-
-        with open(self.manifest_path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        return copy.deepcopy(self._manifest_data())
 
     def write_manifest(self, manifest: Dict[str, Any]) -> None:
         """
@@ -40,21 +102,34 @@ class ManifestManager:
         Args:
             manifest: Manifest data to write
         """
-        with open(self.manifest_path, "w", encoding="utf-8") as f:
-            json.dump(manifest, f, indent=2, ensure_ascii=False)
+        self._store_manifest(copy.deepcopy(manifest))
+
+    def _store_manifest(self, manifest: Dict[str, Any]) -> None:
+        """Replace the cached root manifest and write it, or mark it dirty inside a batch."""
+        self._manifest = manifest
+        if self._batch_depth:
+            self._manifest_dirty = True
+        else:
+            _write_json_atomic(self.manifest_path, manifest)
+
+    def _lockfile_data(self) -> Dict[str, Any]:
+        """Return the cached lockfile, loading it on first use. Callers must not leak it."""
+        if self._lockfile is None:
+            if not self.lockfile_path.exists():
+                self._lockfile = {"plugins": {}}
+            else:
+                self._lockfile = json_utils.loads(self.lockfile_path.read_bytes())
+        return self._lockfile
 
     def read_lockfile(self) -> Dict[str, Any]:
         """
         Read the meshtastic-lock.json file.
 
         Returns:
-            Dict containing lockfile data, or empty dict if file doesn't exist
+            Copy of the lockfile data (editing it changes nothing until written back),
+            or empty dict if file doesn't exist
         """
-        if not self.lockfile_path.exists():
-            return {"plugins": {}}
-
-        with open(self.lockfile_path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        return copy.deepcopy(self._lockfile_data())
 
     def write_lockfile(self, lockfile: Dict[str, Any]) -> None:
         """
@@ -63,8 +138,31 @@ class ManifestManager:
         Args:
             lockfile: Lockfile data to write
         """
-        with open(self.lockfile_path, "w", encoding="utf-8") as f:
-            json.dump(lockfile, f, indent=2, ensure_ascii=False)
+        self._store_lockfile(copy.deepcopy(lockfile))
+
+    def _store_lockfile(self, lockfile: Dict[str, Any]) -> None:
+        """Replace the cached lockfile and write it, or mark it dirty inside a batch."""
+        self._lockfile = lockfile
+        self._reverse_deps = None
+        if self._batch_depth:
+            self._lockfile_dirty = True
+        else:
+            _write_json_atomic(self.lockfile_path, lockfile)
+
+    def reverse_deps(self) -> Dict[str, Set[str]]:
+        """
+        Get the reverse dependency index of the lockfile.
+
+        Returns:
+            Dict mapping each dependency slug to the set of plugin slugs that depend on it
+        """
+        if self._reverse_deps is None:
+            reverse: Dict[str, Set[str]] = {}
+            for slug, plugin_data in self._lockfile_data().get("plugins", {}).items():
+                for dep_slug in plugin_data.get("dependencies", {}):
+                    reverse.setdefault(dep_slug, set()).add(slug)
+            self._reverse_deps = reverse
+        return self._reverse_deps
 
     def get_plugin_manifest(self, plugin_slug: str) -> Optional[Dict[str, Any]]:
         """
@@ -76,14 +174,34 @@ class ManifestManager:
         Returns:
             Dict containing plugin manifest, or None if not found
         """
-        plugin_dir = self.project_dir / "plugins" / plugin_slug
-        manifest_file = plugin_dir / "meshtastic.json"
-
-        if not manifest_file.exists():
+        manifest_file = self.project_dir / "plugins" / plugin_slug / "meshtastic.json"
+        try:
+            st = os.stat(manifest_file)
+        except OSError:
+            self._plugin_manifest_cache.pop(plugin_slug, None)
             return None
 
-        with open(manifest_file, "r", encoding="utf-8") as f:
-            return json.load(f)
+        # Reuse the parsed manifest while the file is unchanged
+        key = (st.st_ino, st.st_mtime_ns, st.st_size)
+        cached = self._plugin_manifest_cache.get(plugin_slug)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        plugin_manifest = json_utils.loads(manifest_file.read_bytes())
+        self._plugin_manifest_cache[plugin_slug] = (key, plugin_manifest)
+        return plugin_manifest
+
+    def invalidate_plugin_manifest(self, plugin_slug: Optional[str] = None) -> None:
+        """
+        Forget cached plugin manifests after a plugin was installed, linked or removed.
+
+        Args:
+            plugin_slug: Slug of the plugin, or None to forget all of them
+        """
+        if plugin_slug is None:
+            self._plugin_manifest_cache.clear()
+        else:
+            self._plugin_manifest_cache.pop(plugin_slug, None)
 
     def add_dependency(self, plugin_slug: str, version_spec: str) -> None:
         """
@@ -93,11 +211,20 @@ class ManifestManager:
             plugin_slug: Slug of the plugin
             version_spec: Version specification (e.g., "^1.0.0")
         """
-        manifest = self.read_manifest()
-        if "plugins" not in manifest:
-            manifest["plugins"] = {}
-        manifest["plugins"][plugin_slug] = version_spec
-        self.write_manifest(manifest)
+        self.add_dependencies_bulk({plugin_slug: version_spec})
+
+    def add_dependencies_bulk(self, dependencies: Dict[str, str]) -> None:
+        """
+        Add several dependencies to the root manifest with a single write.
+
+        Args:
+            dependencies: Dict of plugin slugs to version specifications
+        """
+        if not dependencies:
+            return
+        manifest = self._manifest_data()
+        manifest.setdefault("plugins", {}).update(dependencies)
+        self._store_manifest(manifest)
 
     def remove_dependency(self, plugin_slug: str) -> bool:
         """
@@ -109,10 +236,10 @@ class ManifestManager:
         Returns:
             True if removed, False if not found
         """
-        manifest = self.read_manifest()
+        manifest = self._manifest_data()
         if "plugins" in manifest and plugin_slug in manifest["plugins"]:
             del manifest["plugins"][plugin_slug]
-            self.write_manifest(manifest)
+            self._store_manifest(manifest)
             return True
         return False
 
@@ -136,20 +263,53 @@ class ManifestManager:
             dependencies: Dict of dependency slugs to version specs
             transitive: Whether this is a transitive dependency
         """
-        lockfile = self.read_lockfile()
-        if "plugins" not in lockfile:
-            lockfile["plugins"] = {}
+        self.update_lockfile_bulk({
+            plugin_slug: self.lockfile_entry(version, repo, resolved, dependencies, transitive),
+        })
+
+    @staticmethod
+    def lockfile_entry(
+        version: str,
+        repo: str,
+        resolved: str,
+        dependencies: Dict[str, str],
+        transitive: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Build the lockfile entry for an installed plugin.
+
+        Args:
+            version: Resolved version
+            repo: Repository URL
+            resolved: Resolved commit/tag SHA
+            dependencies: Dict of dependency slugs to version specs
+            transitive: Whether this is a transitive dependency
 
-        lockfile["plugins"][plugin_slug] = {
+        Returns:
+            Lockfile entry dict
+        """
+        entry = {
             "version": version,
             "repo": repo,
             "resolved": resolved,
             "dependencies": dependencies,
         }
         if transitive:
-            lockfile["plugins"][plugin_slug]["transitive"] = True
+            entry["transitive"] = True
+        return entry
 
-        self.write_lockfile(lockfile)
+    def update_lockfile_bulk(self, entries: Dict[str, Dict[str, Any]]) -> None:
+        """
+        Update several plugin entries in the lockfile with a single write.
+
+        Args:
+            entries: Dict of plugin slugs to lockfile entries (see lockfile_entry)
+        """
+        if not entries:
+            return
+        lockfile = self._lockfile_data()
+        lockfile.setdefault("plugins", {}).update(entries)
+        self._store_lockfile(lockfile)
 
     def update_lockfile_linked_plugin(
         self,
@@ -165,18 +325,26 @@ class ManifestManager:
             local_path: Local path that was linked
             dependencies: Dict of dependency slugs to version specs
         """
-        lockfile = self.read_lockfile()
-        if "plugins" not in lockfile:
-            lockfile["plugins"] = {}
+        self.update_lockfile_bulk({plugin_slug: self.linked_lockfile_entry(local_path, dependencies)})
 
-        lockfile["plugins"][plugin_slug] = {
+    @staticmethod
+    def linked_lockfile_entry(local_path: str, dependencies: Dict[str, str]) -> Dict[str, Any]:
+        """
+        Build the lockfile entry for a linked plugin.
+
+        Args:
+            local_path: Local path that was linked
+            dependencies: Dict of dependency slugs to version specs
+
+        Returns:
+            Lockfile entry dict
+        """
+        return {
             "linked": True,
             "path": str(Path(local_path).resolve()),
             "dependencies": dependencies,
         }
 
-        self.write_lockfile(lockfile)
-
     def remove_lockfile_plugin(self, plugin_slug: str) -> bool:
         """
         Remove a plugin from the lockfile.
@@ -187,10 +355,10 @@ class ManifestManager:
         Returns:
             True if removed, False if not found
         """
-        lockfile = self.read_lockfile()
+        lockfile = self._lockfile_data()
         if "plugins" in lockfile and plugin_slug in lockfile["plugins"]:
             del lockfile["plugins"][plugin_slug]
-            self.write_lockfile(lockfile)
+            self._store_lockfile(lockfile)
             return True
         return False
 
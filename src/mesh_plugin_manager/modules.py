@@ -4,6 +4,8 @@ import os
 import re
 import sys
 
+from mesh_plugin_manager.build_utils import iter_plugin_files
+
 
 def generate_dynamic_modules(project_dir, plugins, verbose=True):
     """
@@ -36,36 +38,32 @@ def generate_dynamic_modules(project_dir, plugins, verbose=True):
         if not os.path.isdir(src_path):
             continue
 
-        for root, dirs, files in os.walk(src_path):
-            # Skip hidden directories
-            dirs[:] = [d for d in dirs if not d.startswith(".")]
-            for file in files:
-                if file.endswith(".h"):
-                    header_path = os.path.join(root, file)
-                    try:
-                        with open(header_path, "r", encoding="utf-8") as f:
-                            content = f.read()
-                            # Search for MPM_REGISTER_MESHTASTIC_MODULE comment directive in the file
-                            for match in module_pattern.finditer(content):
-                                class_name = match.group(1)
-                                variable_name = match.group(2)
-                                # Calculate explicit include path: plugin_name/src/.../header.h
-                                # Get relative path from src_path to header file
-                                rel_path_from_src = os.path.relpath(header_path, src_path)
-                                # Construct explicit include path
-                                header_filename = f"{plugin_name}/src/{rel_path_from_src}"
-                                module_registrations.append({
-                                    "plugin_name": plugin_name,
-                                    "class_name": class_name,
-                                    "header_filename": header_filename,
-                                    "variable_name": variable_name,
-                                })
-                                if verbose:
-                                    var_info = f" -> {variable_name}" if variable_name else ""
-                                    print(f"MPM: Found module {class_name} in {plugin_name}/{os.path.basename(header_path)}{var_info}")
-                    except Exception as e:
+        for header_entry in iter_plugin_files(src_path, ".h"):
+            header_path = header_entry.path
+            try:
+                with open(header_path, "r", encoding="utf-8") as f:
+                    content = f.read()
+                    # Search for MPM_REGISTER_MESHTASTIC_MODULE comment directive in the file
+                    for match in module_pattern.finditer(content):
+                        class_name = match.group(1)
+                        variable_name = match.group(2)
+                        # Calculate explicit include path: plugin_name/src/.../header.h
+                        # Get relative path from src_path to header file
+                        rel_path_from_src = os.path.relpath(header_path, src_path)
+                        # Construct explicit include path
+                        header_filename = f"{plugin_name}/src/{rel_path_from_src}"
+                        module_registrations.append({
+                            "plugin_name": plugin_name,
+                            "class_name": class_name,
+                            "header_filename": header_filename,
+                            "variable_name": variable_name,
+                        })
                         if verbose:
-                            print(f"MPM: Warning: Failed to read {header_path}: {e}")
+                            var_info = f" -> {variable_name}" if variable_name else ""
+                            print(f"MPM: Found module {class_name} in {plugin_name}/{os.path.basename(header_path)}{var_info}")
+            except Exception as e:
+                if verbose:
+                    print(f"MPM: Warning: Failed to read {header_path}: {e}")
 
     # Sort by plugin name and class name for determinism
     module_registrations.sort(key=lambda x: (x["plugin_name"], x["class_name"]))
@@ -1,11 +1,21 @@
 """Firmware patching functionality for mpm."""
 
+import functools
+import mmap
 import os
 import re
 import subprocess
 import sys
-from pathlib import Path
 from importlib import resources
+from pathlib import Path
+
+_PATCH_RE = re.compile(r'firmware-patch-v(\d+)\.(\d+)\.(\d+)\.diff$')
+# "diff --git a/<path> b/<path>" header of each file section in a patch
+_DIFF_HEADER_RE = re.compile(rb'^diff --git a/(\S+) b/\S+', re.MULTILINE)
+# Patches ship as package data; resolved through importlib.resources so they also work from a zip
+_PATCHES_DIR = resources.files("mesh_plugin_manager").joinpath("patches")
+# major/minor/build entries of the firmware's version.properties
+_VERSION_PROPS_RE = re.compile(rb'major\s*=\s*(\d+).*?minor\s*=\s*(\d+).*?build\s*=\s*(\d+)', re.DOTALL)
 
 
 def _parse_version(version_str):
@@ -22,36 +32,73 @@ def _parse_version(version_str):
         return (0, 0, 0)
 
 
-def _get_current_branch_or_tag(project_path):
-    """Get the current branch name or tag name from git."""
+def _read_git_head(project_path):
+    """
+    Read the contents of the repository's HEAD file without running git.
+
+    Handles both a .git directory and a .git file pointing elsewhere (worktrees, submodules).
+
+    Returns:
+        Stripped HEAD contents, or None if it can't be read
+    """
+    git_path = project_path / ".git"
     try:
-        # First, check if we're on a branch
-        result = subprocess.run(
-            ["git", "rev-parse", "--abbrev-ref", "HEAD"],
-            cwd=project_path,
-            capture_output=True,
-            text=True,
-        )
-        if result.returncode == 0:
-            branch = result.stdout.strip()
-            # If not detached HEAD, return branch name
-            if branch != "HEAD":
-                return branch
-        
-        # Check if we're on a tag
+        if git_path.is_file():
+            gitdir = git_path.read_text(encoding="utf-8").strip()
+            if not gitdir.startswith("gitdir:"):
+                return None
+            git_path = project_path / gitdir[len("gitdir:"):].strip()
+        return (git_path / "HEAD").read_text(encoding="utf-8").strip()
+    except OSError:
+        return None
+
+
+@functools.lru_cache(maxsize=8)
+def _git_state(project_path):
+    """
+    Get the current branch and tags of a checkout.
+
+    The branch comes from .git/HEAD; a single `git describe --long` gives both the exact and
+    the nearest tag.
+
+    Returns:
+        Tuple of (branch, tag at HEAD, nearest tag), each None if not applicable
+    """
+    branch = exact_tag = nearest_tag = None
+    try:
+        # HEAD names the branch directly unless detached
+        head = _read_git_head(project_path)
+        if head is not None and head.startswith("ref: refs/heads/"):
+            branch = head[len("ref: refs/heads/"):]
+        elif head is None:
+            result = subprocess.run(
+                ["git", "rev-parse", "--abbrev-ref", "HEAD"],
+                cwd=project_path,
+                capture_output=True,
+                text=True,
+            )
+            # A detached HEAD reports itself as "HEAD"
+            if result.returncode == 0 and result.stdout.strip() != "HEAD":
+                branch = result.stdout.strip()
+
         result = subprocess.run(
-            ["git", "describe", "--exact-match", "--tags", "HEAD"],
+            ["git", "describe", "--tags", "--long", "HEAD"],
             cwd=project_path,
             capture_output=True,
             text=True,
         )
         if result.returncode == 0:
-            return result.stdout.strip()
+            # "<tag>-<commits since tag>-g<sha>"; the tag itself may contain hyphens
+            tag, distance, _ = result.stdout.strip().rsplit("-", 2)
+            nearest_tag = tag
+            if distance == "0":
+                exact_tag = tag
     except Exception:
         pass
-    return None
+    return branch, exact_tag, nearest_tag
 
 
+@functools.lru_cache(maxsize=8)
 def _get_firmware_version(project_path):
     """
     Get the firmware version from git tags or version.properties.
@@ -59,60 +106,58 @@ def _get_firmware_version(project_path):
     """
     try:
         # Get the nearest tag
-        result = subprocess.run(
-            ["git", "describe", "--tags", "--abbrev=0"],
-            cwd=project_path,
-            capture_output=True,
-            text=True,
-        )
-        if result.returncode == 0:
-            tag = result.stdout.strip()
+        tag = _git_state(project_path)[2]
+        if tag:
             # Extract version from tag (e.g., "v2.7.16" -> "2.7.16")
             version_match = re.search(r'v?(\d+\.\d+\.\d+)', tag)
             if version_match:
                 return version_match.group(1)
         
         # Fallback: try to get version from version.properties
-        version_props = project_path / "version.properties"
-        if version_props.exists():
-            with open(version_props, 'r') as f:
-                content = f.read()
-                # Look for major.minor.build pattern
-                match = re.search(r'major\s*=\s*(\d+).*minor\s*=\s*(\d+).*build\s*=\s*(\d+)', content, re.DOTALL)
-                if match:
-                    return f"{match.group(1)}.{match.group(2)}.{match.group(3)}"
+        try:
+            content = (project_path / "version.properties").read_bytes()
+        except OSError:
+            return None
+        # Look for major.minor.build pattern, matching bytes so the file is never decoded
+        match = _VERSION_PROPS_RE.search(content)
+        if match:
+            return b".".join(match.groups()).decode("ascii")
     except Exception:
         pass
     return None
 
 
+@functools.lru_cache(maxsize=1)
 def _find_available_patches():
-    """Find all available patch files."""
+    """
+    Find all versioned patch files shipped with the package.
+
+    The patch set never changes at runtime, so the directory is scanned once.
+
+    Returns:
+        List of (version tuple, patch resource), latest version first
+    """
     patches = []
-    # Use filesystem approach - patches are in the same package directory
-    module_dir = Path(__file__).parent
-    patches_dir = module_dir / "patches"
-    if patches_dir.exists():
-        for patch_file in patches_dir.glob("firmware-patch-v*.diff"):
-            patches.append(str(patch_file))
-    
+    try:
+        for entry in _PATCHES_DIR.iterdir():
+            match = _PATCH_RE.match(entry.name)
+            if match:
+                patches.append((tuple(map(int, match.groups())), entry))
+    except OSError:
+        return []
+    patches.sort(key=lambda patch: patch[0], reverse=True)
     return patches
 
 
 def _find_named_patch(tag_name):
     """Find a patch file for a non-version tag (e.g., firmware-patch-develop.diff)."""
-    module_dir = Path(__file__).parent
-    patches_dir = module_dir / "patches"
-    if patches_dir.exists():
-        patch_path = patches_dir / f"firmware-patch-{tag_name}.diff"
-        if patch_path.exists():
-            return str(patch_path)
-    return None
+    patch = _PATCHES_DIR.joinpath(f"firmware-patch-{tag_name}.diff")
+    return patch if patch.is_file() else None
 
 
 def _get_patch_path(project_dir):
     """
-    Get the path to the appropriate firmware patch file.
+    Get the appropriate firmware patch file as a package resource.
     Priority:
     1. Exact match for current branch/tag name (e.g., firmware-patch-develop.diff)
     2. Version-based matching (latest patch <= firmware version)
@@ -120,17 +165,16 @@ def _get_patch_path(project_dir):
     4. Panic with error
     """
     project_path = Path(project_dir)
-    module_dir = Path(__file__).parent
-    patches_dir = module_dir / "patches"
     
     # Step 1: Check for exact branch/tag match first
-    branch_or_tag = _get_current_branch_or_tag(project_path)
+    branch, exact_tag, _ = _git_state(project_path)
+    branch_or_tag = branch or exact_tag
     if branch_or_tag:
         # Strip 'v' prefix if present (e.g., "vdevelop" -> "develop")
         clean_name = branch_or_tag.lstrip('v')
         named_patch = _find_named_patch(clean_name)
         if named_patch:
-            print(f"Found exact match patch file for '{branch_or_tag}': {Path(named_patch).name}")
+            print(f"Found exact match patch file for '{branch_or_tag}': {named_patch.name}")
             return named_patch
     
     # Step 2: Fall back to version-based matching
@@ -138,39 +182,25 @@ def _get_patch_path(project_dir):
     if firmware_version:
         firmware_ver_tuple = _parse_version(firmware_version)
         
-        # Find all available versioned patches
-        available_patches = _find_available_patches()
-        if available_patches:
-            # Extract versions from patch filenames and filter compatible ones
-            compatible_patches = []
-            for patch_path in available_patches:
-                # Extract version from filename (e.g., "firmware-patch-v2.6.13.diff" -> "2.6.13")
-                match = re.search(r'firmware-patch-v(\d+\.\d+\.\d+)\.diff', Path(patch_path).name)
-                if match:
-                    patch_version = match.group(1)
-                    patch_ver_tuple = _parse_version(patch_version)
-                    # Only include patches where patch version <= firmware version
-                    if patch_ver_tuple <= firmware_ver_tuple:
-                        compatible_patches.append((patch_ver_tuple, patch_path))
-            
-            if compatible_patches:
-                # Sort by version (descending) and return the latest compatible patch
-                compatible_patches.sort(key=lambda x: x[0], reverse=True)
-                selected_patch = compatible_patches[0][1]
-                selected_version = ".".join(str(v) for v in compatible_patches[0][0])
+        # Patches are sorted latest first, so the first one not newer than the firmware wins
+        for patch_ver_tuple, patch_path in _find_available_patches():
+            if patch_ver_tuple <= firmware_ver_tuple:
+                selected_version = ".".join(str(v) for v in patch_ver_tuple)
                 print(f"Selected patch version {selected_version} for firmware version {firmware_version}")
-                return selected_patch
+                return patch_path
     
     # Step 3: Fallback to old naming convention
-    patch_path = patches_dir / "firmware-patch.diff"
-    if patch_path.exists():
+    patch = _PATCHES_DIR.joinpath("firmware-patch.diff")
+    if patch.is_file():
         print("Using fallback patch file: firmware-patch.diff")
-        return str(patch_path)
+        return patch
     
     # Step 4: Panic - no patch found
     available_patches = []
-    if patches_dir.exists():
-        available_patches = [p.name for p in patches_dir.glob("firmware-patch-*.diff")]
+    if _PATCHES_DIR.is_dir():
+        available_patches = [
+            p.name for p in _PATCHES_DIR.iterdir() if p.name.startswith("firmware-patch-") and p.name.endswith(".diff")
+        ]
     
     error_msg = "Could not find any compatible firmware patch file.\n"
     if branch_or_tag:
@@ -183,13 +213,34 @@ def _get_patch_path(project_dir):
     raise FileNotFoundError(error_msg)
 
 
+def _patched_files(patch_path):
+    """
+    List the files a patch touches, from its "diff --git" headers.
+
+    The patch is memory-mapped and scanned as bytes rather than read and split into lines.
+
+    Args:
+        patch_path: Path to the .diff file
+
+    Returns:
+        List of paths relative to the repository root
+    """
+    with open(patch_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return []
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return [m.group(1).decode("utf-8", errors="replace") for m in _DIFF_HEADER_RE.finditer(mm)]
+
+
 def _has_conflict_markers(file_path):
-    """Check if a file contains git conflict markers."""
+    """Check if a file contains git conflict markers, searching its bytes without decoding."""
     try:
-        with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-            content = f.read()
-            # Check for definitive git conflict markers
-            return "<<<<<<<" in content or ">>>>>>>" in content
+        with open(file_path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return False
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                # Check for definitive git conflict markers
+                return mm.find(b"<<<<<<<") != -1 or mm.find(b">>>>>>>") != -1
     except Exception:
         return False
 
@@ -206,15 +257,41 @@ def apply_patch(project_dir):
         True if patch was applied successfully or conflicts were created, False otherwise
     """
     project_path = Path(project_dir)
-    patch_path = _get_patch_path(project_dir)
+    patch = _get_patch_path(project_dir)
 
     # Check if this is a git repository
     if not (project_path / ".git").exists():
         print("Error: Project directory is not a git repository", file=sys.stderr)
         return False
 
-    # Apply the patch using 3-way merge to create conflicts when needed
+    # git needs a real file; this is the packaged file itself unless mpm runs from a zip
+    with resources.as_file(patch) as patch_path:
+        return _apply_patch_file(project_path, patch_path)
+
+
+def _apply_patch_file(project_path, patch_path):
+    """
+    Apply a patch file to a git checkout, falling back to a 3-way merge.
+
+    Args:
+        project_path: Root directory of the firmware project
+        patch_path: Filesystem path to the .diff file
+
+    Returns:
+        True if patch was applied successfully or conflicts were created, False otherwise
+    """
     try:
+        # If the patch reverses cleanly it is already applied, so skip the 3-way apply entirely
+        check = subprocess.run(
+            ["git", "apply", "--reverse", "--check", patch_path],
+            cwd=project_path,
+            capture_output=True,
+        )
+        if check.returncode == 0:
+            print("Patch is already applied.")
+            return True
+
+        # Apply the patch using 3-way merge to create conflicts when needed
         result = subprocess.run(
             ["git", "apply", "--3way", patch_path],
             cwd=project_path,
@@ -234,16 +311,11 @@ def apply_patch(project_dir):
             # Scan for conflict markers in files mentioned in the patch
             conflicts_found = False
             conflicted_files = []
-            patch_content = Path(patch_path).read_text(encoding="utf-8", errors="ignore")
-            for line in patch_content.split("\n"):
-                if line.startswith("diff --git"):
-                    # Extract filename from "diff --git a/path b/path"
-                    parts = line.split()
-                    if len(parts) >= 4:
-                        file_path = project_path / parts[2].lstrip("a/")
-                        if file_path.exists() and _has_conflict_markers(file_path):
-                            conflicts_found = True
-                            conflicted_files.append(str(file_path.relative_to(project_path)))
+            for relative_path in _patched_files(patch_path):
+                file_path = project_path / relative_path
+                if file_path.exists() and _has_conflict_markers(file_path):
+                    conflicts_found = True
+                    conflicted_files.append(relative_path)
 
             if conflicts_found:
                 print("Patch conflicts detected. Files contain conflict markers. Please resolve conflicts manually.")
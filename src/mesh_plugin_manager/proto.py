@@ -1,11 +1,75 @@
 """Protobuf generation functions."""
 
+import concurrent.futures
 import os
+import re
 import subprocess
-import sys
 
+# import "other.proto"; (optionally public/weak), read from raw bytes
+_PROTO_IMPORT_RE = re.compile(rb'^\s*import\s+(?:public\s+|weak\s+)?"([^"]+)"\s*;', re.MULTILINE)
 
-def generate_protobuf_files(proto_file, options_file=None, output_dir=None, nanopb_dir=None):
+
+def _proto_inputs(proto_file, options_file, proto_dir):
+    """
+    Collect every file a proto's generated output depends on.
+
+    Follows import statements transitively, resolving them against the include
+    directory passed to nanopb. Imports that live outside it (e.g. nanopb.proto or
+    google/protobuf/*) belong to the toolchain and are skipped.
+
+    Args:
+        proto_file: Path to the .proto file
+        options_file: Path to its .options file, or None
+        proto_dir: Include directory handed to nanopb_generator
+
+    Returns:
+        List of input paths: the proto, its options file and every imported proto and options file
+    """
+    inputs = [proto_file, options_file] if options_file else [proto_file]
+    seen = {proto_file}
+    pending = [proto_file]
+    while pending:
+        try:
+            with open(pending.pop(), "rb") as f:
+                imports = _PROTO_IMPORT_RE.findall(f.read())
+        except OSError:
+            continue
+        for name in imports:
+            imported = os.path.join(proto_dir, os.fsdecode(name))
+            if imported in seen or not os.path.isfile(imported):
+                continue
+            seen.add(imported)
+            pending.append(imported)
+            inputs.append(imported)
+            imported_options = os.path.splitext(imported)[0] + ".options"
+            if os.path.isfile(imported_options):
+                inputs.append(imported_options)
+    return inputs
+
+
+def _outputs_up_to_date(output_dir, proto_name, inputs):
+    """
+    Check whether generated files are newer than every input, make-style.
+
+    Args:
+        output_dir: Directory holding the generated files
+        proto_name: Proto file name without extension
+        inputs: Paths of the .proto file and everything it depends on (see _proto_inputs)
+
+    Returns:
+        True if both <proto_name>.pb.h and .pb.cpp exist and are newer than all inputs
+    """
+    try:
+        oldest_output = min(
+            os.stat(os.path.join(output_dir, f"{proto_name}.pb{ext}")).st_mtime_ns for ext in (".h", ".cpp")
+        )
+        newest_input = max(os.stat(path).st_mtime_ns for path in inputs)
+    except OSError:
+        return False
+    return oldest_output > newest_input
+
+
+def generate_protobuf_files(proto_file, options_file=None, output_dir=None, nanopb_dir=None, force=False, log=print):
     """
     Generate protobuf C++ files using nanopb.
 
@@ -14,6 +78,8 @@ def generate_protobuf_files(proto_file, options_file=None, output_dir=None, nano
         options_file: Optional path to .options file
         output_dir: Optional output directory (defaults to proto file directory)
         nanopb_dir: Optional nanopb directory (unused, kept for compatibility)
+        force: Regenerate even if the outputs are newer than the inputs
+        log: Receives progress and error messages (prints them by default)
 
     Returns:
         bool: True if successful, False otherwise
@@ -21,7 +87,7 @@ def generate_protobuf_files(proto_file, options_file=None, output_dir=None, nano
     # Resolve proto file path
     proto_file = os.path.abspath(proto_file)
     if not os.path.exists(proto_file):
-        print(f"Error: Proto file not found: {proto_file}")
+        log(f"Error: Proto file not found: {proto_file}")
         return False
 
     # Get proto directory and filename
@@ -43,15 +109,19 @@ def generate_protobuf_files(proto_file, options_file=None, output_dir=None, nano
         candidate_options = os.path.join(proto_dir, f"{proto_name}.options")
         if os.path.exists(candidate_options):
             options_file = candidate_options
-            print(f"Auto-detected options file: {options_file}")
+            log(f"Auto-detected options file: {options_file}")
     elif options_file:
         options_file = os.path.abspath(options_file)
         if not os.path.exists(options_file):
-            print(f"Warning: Options file not found: {options_file}")
+            log(f"Warning: Options file not found: {options_file}")
             options_file = None
 
-    # Always generate protobuf files
-    print(f"Generating protobuf files from {proto_basename}...")
+    # Skip nanopb entirely when nothing changed since the last generation, imports included
+    if not force and _outputs_up_to_date(output_dir, proto_name, _proto_inputs(proto_file, options_file, proto_dir)):
+        log(f"Protobuf files for {proto_basename} are up to date")
+        return True
+
+    log(f"Generating protobuf files from {proto_basename}...")
 
     # Note: nanopb_generator should be in the PATH, otherwise this will fail.
     # Tyically, pip handles this by adding the virtualenv/bin directory to the PATH.
@@ -72,39 +142,57 @@ def generate_protobuf_files(proto_file, options_file=None, output_dir=None, nano
     try:
         # Run in proto directory so nanopb can find the .options file
         # We use cwd argument instead of os.chdir to avoid thread-safety issues in SCons
-        result = subprocess.run(cmd, cwd=proto_dir, check=True, capture_output=True, text=True)
-        # if result.stdout:
-        #     print(result.stdout)
-        # if result.stderr:
-        #     print(result.stderr)
+        # Progress output is never shown, so only stderr is kept for error reporting
+        subprocess.run(
+            cmd,
+            cwd=proto_dir,
+            check=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
         return True
 
     except subprocess.CalledProcessError as e:
-        print(f"Error generating protobufs: {e}")
-        if e.stdout:
-            print(e.stdout)
+        log(f"Error generating protobufs: {e}")
         if e.stderr:
-            print(e.stderr)
+            log(e.stderr)
         return False
 
 
-def generate_all_protobuf_files(plugins, verbose=True):
+def _generate_collecting_messages(job, force):
+    """
+    Generate one proto file from a worker thread, returning its output instead of printing it.
+
+    Args:
+        job: (plugin_name, proto_basename, proto_file, options_path, proto_dir) tuple
+        force: Regenerate even when the outputs are newer than the inputs
+
+    Returns:
+        Tuple of (success, list of messages)
+    """
+    _, _, proto_file, options_path, proto_dir = job
+    messages = []
+    ok = generate_protobuf_files(proto_file, options_path, proto_dir, None, force, log=messages.append)
+    return ok, messages
+
+
+def generate_all_protobuf_files(plugins, verbose=True, force=False):
     """
     Generate protobuf files for all proto files found in plugins.
 
     Args:
         plugins: List of plugin tuples from scan_plugins()
         verbose: Whether to print status messages
+        force: Regenerate even when the outputs are newer than the inputs
 
     Returns:
         Tuple of (success_count, total_count)
     """
-    success_count = 0
-    total_count = 0
-
+    # Find every proto file (and its options file) up front
+    jobs = []
     for plugin_name, plugin_path, src_path, proto_files in plugins:
         for proto_file in proto_files:
-            total_count += 1
             proto_basename = os.path.basename(proto_file)
             proto_dir = os.path.dirname(proto_file)
             proto_name = os.path.splitext(proto_basename)[0]
@@ -113,13 +201,25 @@ def generate_all_protobuf_files(plugins, verbose=True):
             options_file = os.path.join(proto_dir, f"{proto_name}.options")
             options_path = options_file if os.path.exists(options_file) else None
 
-            if verbose:
-                print(f"MPM: Processing {proto_basename} from {plugin_name}...")
+            jobs.append((plugin_name, proto_basename, proto_file, options_path, proto_dir))
 
-            if generate_protobuf_files(proto_file, options_path, proto_dir, None):
+    if not jobs:
+        return 0, 0
+
+    # Each file is a separate nanopb_generator process, so run them in parallel
+    success_count = 0
+    max_workers = min(len(jobs), os.cpu_count() or 4, 8)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(lambda job: _generate_collecting_messages(job, force), jobs)
+        for (plugin_name, proto_basename, _, _, _), (ok, messages) in zip(jobs, results):
+            # Workers only collect output, so each file's messages are printed together, in order
+            for message in messages:
+                print(message)
+            if verbose:
+                print(f"MPM: Processed {proto_basename} from {plugin_name}")
+            if ok:
                 success_count += 1
             elif verbose:
                 print(f"MPM: Failed to generate protobuf files for {proto_basename}")
 
-    return success_count, total_count
-
+    return success_count, len(jobs)
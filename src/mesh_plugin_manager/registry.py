@@ -4,9 +4,11 @@ import json
 import os
 import time
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Mapping, Optional, Tuple
 import requests
 
+from mesh_plugin_manager import json_utils
+
 
 class RegistryClient:
     """Client for fetching and caching plugin registry."""
@@ -27,49 +29,110 @@ class RegistryClient:
             cache_dir = tempfile.gettempdir()
         self.cache_dir = Path(cache_dir)
         self.cache_file = self.cache_dir / "mpm-registry-cache.json"
-        self.cache_timestamp_file = self.cache_dir / "mpm-registry-cache-timestamp.txt"
+        # ETag / Last-Modified of the cached registry, used to revalidate it
+        self.cache_validators_file = self.cache_dir / "mpm-registry-cache-validators.json"
+        # Reuse one connection for repeated fetches
+        self._session = requests.Session()
+        self._session.headers.update({"Accept": "application/json"})
+        # Parsed cache contents keyed on the cache file mtime
+        self._mem_cache: Optional[Tuple[int, Dict[str, Any]]] = None
 
     def _is_cache_valid(self) -> bool:
         """Check if the cached registry is still valid."""
-        if not self.cache_file.exists() or not self.cache_timestamp_file.exists():
-            return False
-
+        # The cache file mtime doubles as the fetch timestamp
         try:
-            with open(self.cache_timestamp_file, "r", encoding="utf-8") as f:
-                timestamp = float(f.read().strip())
-            return (time.time() - timestamp) < self.CACHE_DURATION
-        except (ValueError, IOError):
+            st = os.stat(self.cache_file)
+        except OSError:
             return False
+        return (time.time() - st.st_mtime) < self.CACHE_DURATION
 
     def _read_cache(self) -> Optional[Dict[str, Any]]:
         """Read registry from cache."""
-        if not self.cache_file.exists():
+        try:
+            mtime = os.stat(self.cache_file).st_mtime_ns
+        except OSError:
             return None
 
+        # Reuse the already-parsed registry if the file hasn't changed
+        if self._mem_cache is not None and self._mem_cache[0] == mtime:
+            return self._mem_cache[1]
+
         try:
-            with open(self.cache_file, "r", encoding="utf-8") as f:
-                return json.load(f)
+            with open(self.cache_file, "rb") as f:
+                data = json_utils.loads(f.read())
         except (json.JSONDecodeError, IOError):
             return None
 
-    def _write_cache(self, data: Dict[str, Any]) -> None:
-        """Write registry to cache."""
+        self._mem_cache = (mtime, data)
+        return data
+
+    def _read_validators(self) -> Dict[str, str]:
+        """
+        Build conditional request headers from the validators saved with the cache.
+
+        Returns:
+            Dict with If-None-Match and/or If-Modified-Since, empty if none were saved
+        """
+        try:
+            with open(self.cache_validators_file, "rb") as f:
+                validators = json_utils.loads(f.read())
+        except (json.JSONDecodeError, IOError):
+            return {}
+
+        headers = {}
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+        return headers
+
+    def _mark_cache_fresh(self) -> None:
+        """Reset the cache age after the server confirmed the cached registry is current."""
+        try:
+            os.utime(self.cache_file, None)
+            if self._mem_cache is not None:
+                # Contents are unchanged, only the mtime key moved
+                self._mem_cache = (os.stat(self.cache_file).st_mtime_ns, self._mem_cache[1])
+        except OSError:
+            # Ignore cache write failures
+            pass
+
+    def _write_cache(self, raw: bytes, data: Dict[str, Any], response_headers: Mapping[str, str]) -> None:
+        """
+        Write the registry payload to cache exactly as it was downloaded.
+
+        Args:
+            raw: Registry JSON bytes as received from the server
+            data: Parsed registry, kept in memory for subsequent reads
+            response_headers: Response headers, whose ETag/Last-Modified are saved for revalidation
+        """
         try:
             self.cache_dir.mkdir(parents=True, exist_ok=True)
-            with open(self.cache_file, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2)
-            with open(self.cache_timestamp_file, "w", encoding="utf-8") as f:
-                f.write(str(time.time()))
+            # Write atomically so a concurrent reader never sees a partial file
+            tmp_file = self.cache_file.with_name(self.cache_file.name + ".tmp")
+            with open(tmp_file, "wb") as f:
+                f.write(raw)
+            os.replace(tmp_file, self.cache_file)
+            self._mem_cache = (os.stat(self.cache_file).st_mtime_ns, data)
+            validators = {
+                "etag": response_headers.get("ETag"),
+                "last_modified": response_headers.get("Last-Modified"),
+            }
+            with open(self.cache_validators_file, "wb") as f:
+                f.write(json_utils.dumps(validators))
         except IOError:
             # Ignore cache write failures
             pass
 
-    def fetch_registry(self, force_refresh: bool = False) -> Dict[str, Any]:
+    def fetch_registry(self, force_refresh: bool = False, use_cache: bool = True) -> Dict[str, Any]:
         """
         Fetch the plugin registry from remote or cache.
 
         Args:
-            force_refresh: If True, ignore cache and fetch fresh data
+            force_refresh: If True, revalidate the cache with the server even if it is
+                still fresh (a 304 response reuses the cached copy without downloading)
+            use_cache: If False, download the full registry unconditionally and don't fall
+                back to the cache on failure (the download still refreshes the cache)
 
         Returns:
             Dict containing registry data
@@ -77,25 +140,29 @@ class RegistryClient:
         Raises:
             requests.RequestException: If registry fetch fails
         """
-        # Check cache first unless force refresh
-        if not force_refresh and self._is_cache_valid():
-            cached = self._read_cache()
-            if cached is not None:
-                return cached
+        # Read the cache once; it serves fresh hits, 304 revalidation and the offline fallback
+        cached = self._read_cache() if use_cache else None
+        if cached is not None and not force_refresh and self._is_cache_valid():
+            return cached
+
+        # Fetch from remote, letting the server answer 304 if our cached copy is current
+        headers = self._read_validators() if cached is not None else {}
 
-        # Fetch from remote
         try:
-            response = requests.get(self.REGISTRY_URL, timeout=30)
+            response = self._session.get(self.REGISTRY_URL, headers=headers, timeout=30)
+            if response.status_code == 304:
+                self._mark_cache_fresh()
+                return cached
             response.raise_for_status()
-            data = response.json()
+            raw = response.content
+            data = json_utils.loads(raw)
 
             # Write to cache
-            self._write_cache(data)
+            self._write_cache(raw, data, response.headers)
 
             return data
-        except requests.RequestException as e:
-            # If fetch fails, try cache even if stale
-            cached = self._read_cache()
+        except (requests.RequestException, json.JSONDecodeError):
+            # If fetch fails, use the cache even if stale
             if cached is not None:
                 return cached
             raise
@@ -106,7 +173,7 @@ class RegistryClient:
 
         Args:
             plugin_slug: Slug of the plugin
-            force_refresh: If True, ignore cache
+            force_refresh: If True, revalidate the cache with the server
 
         Returns:
             Dict containing plugin info, or None if not found
@@ -119,7 +186,7 @@ class RegistryClient:
         List all plugins in the registry.
 
         Args:
-            force_refresh: If True, ignore cache
+            force_refresh: If True, revalidate the cache with the server
 
         Returns:
             Dict mapping plugin slugs to their info
@@ -1,15 +1,137 @@
 """Dependency resolver using resolvelib."""
 
+import concurrent.futures
 import json
+import operator
 import os
+import re
 import shutil
 import subprocess
 import tempfile
+import threading
+import time
+from operator import attrgetter, itemgetter
 from pathlib import Path
-from typing import Dict, Any, List, Set, Optional, Iterable, Mapping, Iterator, Sequence
+from typing import Callable, Dict, Any, List, Optional, Iterable, Mapping, Iterator, Sequence, Tuple
+import requests
 import resolvelib
 import semver
 
+from mesh_plugin_manager import json_utils
+from mesh_plugin_manager.fs_utils import remove_tree_in_background, user_cache_dir
+
+
+# Comparison operators, two-character prefixes are checked before single-character ones
+_TWO_CHAR_OPERATORS = {">=": operator.ge, "<=": operator.le, "==": operator.eq}
+_ONE_CHAR_OPERATORS = {">": operator.gt, "<": operator.lt, "=": operator.eq}
+
+
+# Hosts that serve raw files at a predictable URL: owner/repo, then the tag
+_GITHUB_REPO_RE = re.compile(r"^https://github\.com/([^/]+)/([^/]+?)(?:\.git)?/?$")
+_GITLAB_REPO_RE = re.compile(r"^https://gitlab\.com/(.+?)(?:\.git)?/?$")
+
+# Cached release manifests are refetched after a week in case a tag was moved
+_MANIFEST_CACHE_TTL = 7 * 24 * 60 * 60
+
+
+def _is_manifest(value: Any) -> bool:
+    """Check that a parsed plugin meshtastic.json has the shape the resolver reads."""
+    return isinstance(value, dict) and isinstance(value.get("dependencies", {}), dict)
+
+
+def _raw_manifest_url(repo_url: str, tag: str) -> Optional[str]:
+    """
+    Build the URL of a release's meshtastic.json on its hosting service.
+
+    Args:
+        repo_url: Git repository URL from the registry
+        tag: Release tag
+
+    Returns:
+        Raw file URL, or None if the host is not known
+    """
+    match = _GITHUB_REPO_RE.match(repo_url)
+    if match:
+        owner, repo = match.groups()
+        return f"https://raw.githubusercontent.com/{owner}/{repo}/{tag}/meshtastic.json"
+    match = _GITLAB_REPO_RE.match(repo_url)
+    if match:
+        return f"https://gitlab.com/{match.group(1)}/-/raw/{tag}/meshtastic.json"
+    return None
+
+
+def _always(version: semver.Version) -> bool:
+    """Predicate for specs that match any version."""
+    return True
+
+
+def _never(version: semver.Version) -> bool:
+    """Predicate for specs that cannot be parsed."""
+    return False
+
+
+def _compile_spec(spec: str) -> Callable[[semver.Version], bool]:
+    """
+    Compile a version specification into a predicate.
+
+    Args:
+        spec: Version specification (e.g., ">=1.0.0", "^1.2.0")
+
+    Returns:
+        Callable that returns True if a semver.Version satisfies spec
+    """
+    spec = spec.strip()
+    if not spec or spec == "*":
+        return _always
+
+    try:
+        # Handle caret ranges (^1.2.3 means >=1.2.3 <2.0.0)
+        if spec.startswith("^"):
+            base_version = semver.Version.parse(spec[1:])
+            next_major = base_version.bump_major()
+            return lambda version: base_version <= version < next_major
+
+        # Handle tilde ranges (~1.2.3 means >=1.2.3 <1.3.0)
+        if spec.startswith("~"):
+            base_version = semver.Version.parse(spec[1:])
+            next_minor = base_version.bump_minor()
+            return lambda version: base_version <= version < next_minor
+
+        # Handle >=, <=, ==, >, <, =
+        compare = _TWO_CHAR_OPERATORS.get(spec[:2])
+        if compare is not None:
+            bound = semver.Version.parse(spec[2:].strip())
+        else:
+            compare = _ONE_CHAR_OPERATORS.get(spec[:1])
+            if compare is not None:
+                bound = semver.Version.parse(spec[1:].strip())
+            else:
+                # Exact match
+                compare = operator.eq
+                bound = semver.Version.parse(spec)
+    except ValueError:
+        return _never
+
+    return lambda version: compare(version, bound)
+
+
+def version_satisfies(version: str, spec: str) -> bool:
+    """
+    Check whether a version string satisfies a version specification.
+
+    Args:
+        version: Version string (e.g., "1.2.3")
+        spec: Version specification (e.g., "^1.2.0")
+
+    Returns:
+        True if version parses and satisfies spec
+    """
+    try:
+        parsed = semver.Version.parse(version)
+    except (TypeError, ValueError):
+        return False
+    return _compile_spec(spec)(parsed)
+
 
 class Requirement:
     """Simple requirement object for resolvelib."""
@@ -22,6 +144,30 @@ class Requirement:
         return f"Requirement({self.identifier}@{self.spec})"
 
 
+class Candidate:
+    """A specific plugin version considered during resolution."""
+
+    __slots__ = ("identifier", "version", "parsed", "_key")
+
+    def __init__(self, identifier: str, version: str, parsed: semver.Version):
+        self.identifier = identifier
+        self.version = version
+        self.parsed = parsed
+        self._key = (identifier, version)
+
+    def __eq__(self, other):
+        return isinstance(other, Candidate) and self._key == other._key
+
+    def __hash__(self):
+        return hash(self._key)
+
+    def __str__(self):
+        return f"{self.identifier}@{self.version}"
+
+    def __repr__(self):
+        return f"Candidate({self.identifier}@{self.version})"
+
+
 class PluginProvider:
     """Provider for resolvelib that handles plugin dependencies."""
 
@@ -41,19 +187,119 @@ class PluginProvider:
         """
         self.registry = registry
         self.project_dir = Path(project_dir)
+        # A temp directory created here is removed again by close()
+        self._owns_temp_dir = temp_dir is None
         if temp_dir is None:
             temp_dir = tempfile.mkdtemp(prefix="mpm-resolve-")
         self.temp_dir = Path(temp_dir)
-        self._manifest_cache: Dict[str, Dict[str, Any]] = {}
+        # Manifests of released versions rarely change, so they are cached across runs,
+        # keyed by "<repo>@<version>" so forks never share entries
+        cache_dir = user_cache_dir()
+        self._persistent_manifest_path = cache_dir / "manifest-cache.json" if cache_dir is not None else None
+        self._manifest_cache: Dict[str, Dict[str, Any]] = self._load_persistent_manifests()
+        self._manifest_cache_dirty = False
         self._requirement_specs: Dict[str, str] = {}  # Map identifier to spec
-        self._candidate_to_identifier: Dict[str, str] = {}  # Map candidate to identifier
+        self._candidate_pool: Dict[Tuple[str, str], Candidate] = {}  # Interned candidates
+        self._spec_cache: Dict[str, Callable[[semver.Version], bool]] = {}  # Compiled version specs
+        self._deps_cache: Dict[str, List[Requirement]] = {}  # Dependency requirements per candidate
+        # Versions pinned by the lockfile, tried before newer matches even when the
+        # registry has moved on, and the dependencies recorded for them
+        self.locked_versions: Dict[str, str] = {}
+        self.locked_dependencies: Dict[str, Dict[str, str]] = {}
+        # Background clones that fetch manifests for candidates ahead of get_dependencies
+        self._clone_pool: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._clone_futures: Dict[str, concurrent.futures.Future] = {}
+        # Keepalive connection for raw manifest downloads
+        # requests.Session isn't thread-safe, so each thread gets its own
+        self._thread_local = threading.local()
+        self._sessions: List[requests.Session] = []
+        self._sessions_lock = threading.Lock()
+
+        # Parse registry versions once up front: identifier -> [(version string, parsed version)],
+        # latest first so find_matches never has to sort
+        self._parsed_versions: Dict[str, List[Tuple[str, semver.Version]]] = {}
+        for identifier, plugin_info in registry.items():
+            if "version" not in plugin_info:
+                continue
+            try:
+                parsed = semver.Version.parse(plugin_info["version"])
+            except ValueError:
+                continue
+            self._parsed_versions.setdefault(identifier, []).append((plugin_info["version"], parsed))
+        for versions in self._parsed_versions.values():
+            versions.sort(key=itemgetter(1), reverse=True)
+
+    def _load_persistent_manifests(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Load manifests cached by previous runs.
+
+        Entries that are malformed or older than the cache TTL are dropped.
+
+        Returns:
+            Dict mapping "<repo>@<version>" to {"fetched": timestamp, "manifest": manifest}
+        """
+        if self._persistent_manifest_path is None:
+            return {}
+        try:
+            with open(self._persistent_manifest_path, "rb") as f:
+                data = json_utils.loads(f.read())
+        except (json.JSONDecodeError, IOError):
+            return {}
+        if not isinstance(data, dict):
+            return {}
+
+        oldest = time.time() - _MANIFEST_CACHE_TTL
+        entries = {}
+        for key, entry in data.items():
+            if (
+                isinstance(entry, dict)
+                and isinstance(entry.get("fetched"), (int, float))
+                and entry["fetched"] >= oldest
+                and _is_manifest(entry.get("manifest"))
+            ):
+                entries[key] = entry
+        return entries
+
+    def _manifest_cache_key(self, identifier: str, version: str) -> Optional[str]:
+        """Return the persistent cache key for a candidate, or None if it has no repo."""
+        repo_url = self.registry.get(identifier, {}).get("repo")
+        return f"{repo_url}@{version}" if repo_url else None
+
+    def _cached_manifest(self, identifier: str, version: str) -> Optional[Dict[str, Any]]:
+        """Return a candidate's manifest from the persistent cache, if present."""
+        key = self._manifest_cache_key(identifier, version)
+        entry = self._manifest_cache.get(key) if key is not None else None
+        return entry["manifest"] if entry is not None else None
+
+    def _save_persistent_manifests(self) -> None:
+        """Write the manifest cache to disk atomically if new manifests were added."""
+        if not self._manifest_cache_dirty or self._persistent_manifest_path is None:
+            return
+        self._manifest_cache_dirty = False
+        tmp_path = self._persistent_manifest_path.with_name(f"{self._persistent_manifest_path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(json_utils.dumps(self._manifest_cache))
+            os.replace(tmp_path, self._persistent_manifest_path)
+        except OSError:
+            # Ignore cache write failures
+            pass
+
+    def _get_candidate(self, identifier: str, version: str, parsed: semver.Version) -> Candidate:
+        """Return the shared Candidate instance for an identifier and version."""
+        key = (identifier, version)
+        candidate = self._candidate_pool.get(key)
+        if candidate is None:
+            candidate = Candidate(identifier, version, parsed)
+            self._candidate_pool[key] = candidate
+        return candidate
 
     def identify(self, requirement_or_candidate):
         """
         Return identifier for a requirement or candidate.
 
         Args:
-            requirement_or_candidate: Requirement object, candidate string, or string identifier
+            requirement_or_candidate: Requirement, Candidate, or string identifier
 
         Returns:
             Plugin slug (identifier)
@@ -61,19 +307,17 @@ class PluginProvider:
         if isinstance(requirement_or_candidate, Requirement):
             self._requirement_specs[requirement_or_candidate.identifier] = requirement_or_candidate.spec
             return requirement_or_candidate.identifier
+        elif isinstance(requirement_or_candidate, Candidate):
+            return requirement_or_candidate.identifier
         elif isinstance(requirement_or_candidate, str):
-            # Could be a candidate (identifier@version) or just an identifier
-            if "@" in requirement_or_candidate:
-                # Extract identifier from candidate
-                return requirement_or_candidate.split("@")[0]
             return requirement_or_candidate
         return str(requirement_or_candidate)
 
     def narrow_requirement_selection(
         self,
         identifiers: Iterable[str],
-        resolutions: Mapping[str, str],
-        candidates: Mapping[str, Iterator[str]],
+        resolutions: Mapping[str, Candidate],
+        candidates: Mapping[str, Iterator[Candidate]],
         information: Mapping[str, Iterator[Any]],
         backtrack_causes: List[Any],
     ) -> Iterable[str]:
@@ -97,8 +341,8 @@ class PluginProvider:
     def get_preference(
         self,
         identifier: str,
-        resolutions: Mapping[str, str],
-        candidates: Mapping[str, Iterator[str]],
+        resolutions: Mapping[str, Candidate],
+        candidates: Mapping[str, Iterator[Candidate]],
         information: Mapping[str, Iterator[Any]],
         backtrack_causes: Sequence[Any],
     ) -> str:
@@ -126,66 +370,74 @@ class PluginProvider:
             return "0"
         
         # Prefer latest versions (reverse sort, so latest comes first)
-        candidates_sorted = sorted(
-            candidate_list,
-            key=lambda v: semver.Version.parse(v.split("@")[1] if "@" in v else v),
-            reverse=True,
-        )
+        candidates_sorted = sorted(candidate_list, key=attrgetter("parsed"), reverse=True)
         if candidates_sorted:
             # Return index of first candidate (lower index = higher preference)
             return str(candidates_sorted.index(candidate_list[0]))
         return "0"
 
-    def find_matches(self, identifier: str, requirements, incompatibilities: List[str]) -> List[str]:
+    def find_matches(
+        self,
+        identifier: str,
+        requirements: Mapping[str, Iterator[Requirement]],
+        incompatibilities: Mapping[str, Iterator[Candidate]],
+    ) -> List[Candidate]:
         """
         Find matching versions for a plugin.
 
         Args:
             identifier: Plugin slug
-            requirements: Version requirements (from resolvelib)
-            incompatibilities: List of incompatible versions
+            requirements: Mapping of identifiers to all requirements placed on them
+            incompatibilities: Mapping of identifiers to candidates ruled out by backtracking
 
         Returns:
-            List of matching version strings (candidates)
+            List of matching candidates, the locked version first and then latest first
         """
-        if identifier not in self.registry:
+        # Every requirement on this identifier must hold, not just the last one seen
+        predicates = [self._get_predicate(req.spec) for req in requirements.get(identifier, ())]
+        if any(predicate is _never for predicate in predicates):
+            # An unparsable spec can never be satisfied
             return []
+        excluded = set(incompatibilities.get(identifier, ()))
 
-        plugin_info = self.registry[identifier]
-        
-        if "version" not in plugin_info:
-            return []
-        
-        available_versions = [plugin_info["version"]]
-
-        # Get version spec from stored requirements or use latest
-        version_spec = self._requirement_specs.get(identifier, "*")
-
-        # Filter by requirements
+        # Filter pre-parsed registry versions by requirements, keeping latest-first order
         matching_versions = []
-        for version_str in available_versions:
-            try:
-                version = semver.Version.parse(version_str)
-            except ValueError:
+        for version_str, version in self._parsed_versions.get(identifier, ()):
+            # Skip incompatibilities
+            candidate = self._get_candidate(identifier, version_str, version)
+            if candidate in excluded:
                 continue
 
-            # Skip incompatibilities (check full candidate format)
-            candidate = f"{identifier}@{version_str}"
-            if candidate in incompatibilities or version_str in incompatibilities:
-                continue
-
-            # Check if version satisfies spec
-            if self._satisfies_version(version, version_spec):
-                # Store mapping from candidate to identifier
-                candidate_str = f"{identifier}@{version_str}"
-                self._candidate_to_identifier[candidate_str] = identifier
-                matching_versions.append(candidate_str)
-
-        return sorted(
-            matching_versions,
-            key=lambda v: semver.Version.parse(v.split("@")[1]) if "@" in v else semver.Version.parse(v),
-            reverse=True,
-        )
+            # Check if version satisfies every spec
+            if all(predicate(version) for predicate in predicates):
+                matching_versions.append(candidate)
+
+        # Keep the locked version if it still satisfies the requirements. The registry only
+        # lists the latest release, so an older pin becomes a candidate of its own
+        locked_candidate = self._locked_candidate(identifier)
+        if locked_candidate is not None and locked_candidate not in excluded:
+            if locked_candidate in matching_versions:
+                matching_versions.remove(locked_candidate)
+                matching_versions.insert(0, locked_candidate)
+            elif all(predicate(locked_candidate.parsed) for predicate in predicates):
+                matching_versions.insert(0, locked_candidate)
+
+        for candidate in matching_versions:
+            # Start fetching the manifest while resolvelib works on other identifiers
+            self._prefetch_manifest(candidate.identifier, candidate.version)
+        return matching_versions
+
+    def _locked_candidate(self, identifier: str) -> Optional[Candidate]:
+        """Return the candidate for a plugin's lockfile version, or None if it has no usable pin."""
+        locked_version = self.locked_versions.get(identifier)
+        # A pin can only be installed while the registry still knows the plugin's repo
+        if locked_version is None or not self.registry.get(identifier, {}).get("repo"):
+            return None
+        try:
+            parsed = semver.Version.parse(locked_version)
+        except ValueError:
+            return None
+        return self._get_candidate(identifier, locked_version, parsed)
 
     def _satisfies_version(self, version: semver.Version, spec: str) -> bool:
         """
@@ -198,91 +450,39 @@ class PluginProvider:
         Returns:
             True if version satisfies spec
         """
-        spec = spec.strip()
-        if not spec or spec == "*":
-            return True
+        return self._get_predicate(spec)(version)
 
-        # Handle caret ranges (^1.2.3 means >=1.2.3 <2.0.0)
-        if spec.startswith("^"):
-            base_version_str = spec[1:]
-            try:
-                base_version = semver.Version.parse(base_version_str)
-                next_major = base_version.bump_major()
-                return version >= base_version and version < next_major
-            except ValueError:
-                return False
-
-        # Handle tilde ranges (~1.2.3 means >=1.2.3 <1.3.0)
-        if spec.startswith("~"):
-            base_version_str = spec[1:]
-            try:
-                base_version = semver.Version.parse(base_version_str)
-                next_minor = base_version.bump_minor()
-                return version >= base_version and version < next_minor
-            except ValueError:
-                return False
-
-        # Handle >=, <=, >, <, =
-        if spec.startswith(">="):
-            try:
-                min_version = semver.Version.parse(spec[2:].strip())
-                return version >= min_version
-            except ValueError:
-                return False
-        elif spec.startswith("<="):
-            try:
-                max_version = semver.Version.parse(spec[2:].strip())
-                return version <= max_version
-            except ValueError:
-                return False
-        elif spec.startswith(">"):
-            try:
-                min_version = semver.Version.parse(spec[1:].strip())
-                return version > min_version
-            except ValueError:
-                return False
-        elif spec.startswith("<"):
-            try:
-                max_version = semver.Version.parse(spec[1:].strip())
-                return version < max_version
-            except ValueError:
-                return False
-        elif spec.startswith("="):
-            try:
-                req_version = semver.Version.parse(spec[1:].strip())
-                return version == req_version
-            except ValueError:
-                return False
-        else:
-            # Exact match
-            try:
-                req_version = semver.Version.parse(spec)
-                return version == req_version
-            except ValueError:
-                return False
+    def _get_predicate(self, spec: str) -> Callable[[semver.Version], bool]:
+        """Return the compiled predicate for a version spec, compiling it once."""
+        predicate = self._spec_cache.get(spec)
+        if predicate is None:
+            predicate = _compile_spec(spec)
+            self._spec_cache[spec] = predicate
+        return predicate
 
-    def get_dependencies(self, candidate: str) -> List:
+    def get_dependencies(self, candidate: Candidate) -> List:
         """
         Get dependencies for a plugin version candidate.
 
         Args:
-            candidate: Candidate string in format "identifier@version"
+            candidate: Candidate to get dependencies for
 
         Returns:
             List of Requirement objects representing dependencies
         """
-        # Parse candidate to get identifier and version
-        if "@" not in candidate:
-            return []
-        
-        identifier, version = candidate.split("@", 1)
-        cache_key = f"{identifier}@{version}"
-        
+        identifier = candidate.identifier
+        version = candidate.version
+        cache_key = str(candidate)
+
+        # Resolvelib revisits candidates while backtracking
+        cached_deps = self._deps_cache.get(cache_key)
+        if cached_deps is not None:
+            return cached_deps
+
         # Check cache first
-        if cache_key in self._manifest_cache:
-            manifest = self._manifest_cache[cache_key]
-            deps = manifest.get("dependencies", {})
-            return [Requirement(dep_slug, dep_spec) for dep_slug, dep_spec in deps.items() if dep_slug != "meshtastic"]
+        manifest = self._cached_manifest(identifier, version)
+        if manifest is not None:
+            return self._deps_to_requirements(cache_key, manifest.get("dependencies", {}))
 
         # Try to get from registry first
         if identifier in self.registry:
@@ -290,62 +490,198 @@ class PluginProvider:
             # Check if this version matches the registry version
             if version == plugin_info.get("version", version):
                 if "dependencies" in plugin_info:
-                    deps = plugin_info["dependencies"]
-                    return [Requirement(dep_slug, dep_spec) for dep_slug, dep_spec in deps.items() if dep_slug != "meshtastic"]
+                    return self._deps_to_requirements(cache_key, plugin_info["dependencies"])
+
+        # The lockfile recorded the dependencies of its pinned version
+        if self._has_locked_dependencies(identifier, version):
+            return self._deps_to_requirements(cache_key, self.locked_dependencies[identifier])
 
         # Clone repo and read meshtastic.json
-        repo_url = None
-        tag = None
-        if identifier in self.registry:
-            plugin_info = self.registry[identifier]
-            repo_url = plugin_info.get("repo")
-            tag = f"v{version}"
+        manifest = self._fetch_manifest(identifier, version)
+        if not _is_manifest(manifest):
+            return []
 
+        # Only the download path reaches here, so the candidate has a repo and a cache key
+        self._manifest_cache[self._manifest_cache_key(identifier, version)] = {
+            "fetched": time.time(),
+            "manifest": manifest,
+        }
+        self._manifest_cache_dirty = True
+        return self._deps_to_requirements(cache_key, manifest.get("dependencies", {}))
+
+    def _deps_to_requirements(self, cache_key: str, deps: Dict[str, str]) -> List[Requirement]:
+        """
+        Build and memoize the requirements for a candidate's dependencies.
+
+        Args:
+            cache_key: Candidate key ("identifier@version")
+            deps: Dependency mapping of slug to version spec
+
+        Returns:
+            List of Requirement objects
+        """
+        # Filter out meshtastic dependency (it's not a plugin)
+        requirements = [Requirement(dep_slug, dep_spec) for dep_slug, dep_spec in deps.items() if dep_slug != "meshtastic"]
+        self._deps_cache[cache_key] = requirements
+        return requirements
+
+    def _needs_clone(self, identifier: str, version: str) -> bool:
+        """Check whether dependencies for a candidate can only be found by cloning its repo."""
+        if self._cached_manifest(identifier, version) is not None:
+            return False
+        if self._has_locked_dependencies(identifier, version):
+            return False
+        plugin_info = self.registry.get(identifier)
+        if plugin_info is None or not plugin_info.get("repo"):
+            return False
+        # The registry lists dependencies for its current version
+        return not (version == plugin_info.get("version", version) and "dependencies" in plugin_info)
+
+    def _has_locked_dependencies(self, identifier: str, version: str) -> bool:
+        """Check whether the lockfile recorded dependencies for this exact candidate."""
+        return self.locked_versions.get(identifier) == version and identifier in self.locked_dependencies
+
+    def _prefetch_manifest(self, identifier: str, version: str) -> None:
+        """
+        Start cloning a candidate's repo in the background if its manifest will be needed.
+
+        Args:
+            identifier: Plugin slug
+            version: Candidate version
+        """
+        cache_key = f"{identifier}@{version}"
+        if cache_key in self._clone_futures or not self._needs_clone(identifier, version):
+            return
+        if self._clone_pool is None:
+            self._clone_pool = concurrent.futures.ThreadPoolExecutor(max_workers=8)
+        self._clone_futures[cache_key] = self._clone_pool.submit(self._download_manifest, identifier, version)
+
+    def _fetch_manifest(self, identifier: str, version: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a candidate's manifest, waiting for a background clone if one was started.
+
+        Args:
+            identifier: Plugin slug
+            version: Candidate version
+
+        Returns:
+            Parsed meshtastic.json, or None if unavailable
+        """
+        future = self._clone_futures.pop(f"{identifier}@{version}", None)
+        if future is not None:
+            return future.result()
+        return self._download_manifest(identifier, version)
+
+    def _download_manifest(self, identifier: str, version: str) -> Optional[Dict[str, Any]]:
+        """
+        Download a candidate's manifest over HTTP, falling back to a git clone.
+
+        Args:
+            identifier: Plugin slug
+            version: Candidate version
+
+        Returns:
+            Parsed meshtastic.json, or None if unavailable
+        """
+        repo_url = self.registry.get(identifier, {}).get("repo")
         if not repo_url:
-            return []
+            return None
+
+        raw_url = _raw_manifest_url(repo_url, f"v{version}")
+        if raw_url is not None:
+            try:
+                response = self._get_session().get(raw_url, timeout=30)
+                if response.status_code == 200:
+                    return json_utils.loads(response.content)
+            except requests.RequestException:
+                pass
+            except json.JSONDecodeError:
+                return None
+        return self._clone_and_read_manifest(identifier, version)
+
+    def _clone_and_read_manifest(self, identifier: str, version: str) -> Optional[Dict[str, Any]]:
+        """
+        Clone a plugin release and read its meshtastic.json.
+
+        Safe to run in a worker thread: it only touches its own temp directory.
+
+        Args:
+            identifier: Plugin slug
+            version: Candidate version
+
+        Returns:
+            Parsed meshtastic.json, or None if unavailable
+        """
+        repo_url = self.registry.get(identifier, {}).get("repo")
+        if not repo_url:
+            return None
+        tag = f"v{version}"
 
         # Clone to temp directory
         temp_plugin_dir = self.temp_dir / f"{identifier}-{version}"
-        if temp_plugin_dir.exists():
-            # Remove if exists
-            shutil.rmtree(temp_plugin_dir)
+        # Clear out any leftover clone without waiting for the delete
+        remove_tree_in_background(temp_plugin_dir)
 
         try:
-            # Clone repo
-            clone_cmd = ["git", "clone", "--depth", "1", "--branch", tag, repo_url, str(temp_plugin_dir)]
+            # Clone without blobs or a checkout; only the manifest blob is fetched below
+            clone_cmd = [
+                "git", "clone", "--depth", "1", "--single-branch", "--filter=blob:none", "--no-checkout",
+                "--branch", tag, repo_url, str(temp_plugin_dir),
+            ]
             subprocess.run(clone_cmd, check=True, capture_output=True)
 
             # Read meshtastic.json
-            manifest_file = temp_plugin_dir / "meshtastic.json"
-            if manifest_file.exists():
-                with open(manifest_file, "r", encoding="utf-8") as f:
-                    manifest = json.load(f)
-                    self._manifest_cache[cache_key] = manifest
-                    deps = manifest.get("dependencies", {})
-                    # Filter out meshtastic dependency (it's not a plugin)
-                    return [Requirement(dep_slug, dep_spec) for dep_slug, dep_spec in deps.items() if dep_slug != "meshtastic"]
-        except (subprocess.CalledProcessError, json.JSONDecodeError, IOError):
-            pass
-
-        return []
-
-    def is_satisfied_by(self, requirement, candidate: str) -> bool:
+            result = subprocess.run(
+                ["git", "show", "HEAD:meshtastic.json"],
+                cwd=temp_plugin_dir,
+                capture_output=True,
+            )
+            if result.returncode != 0:
+                return None
+            # Parse the raw bytes directly, no decode to str first
+            return json_utils.loads(result.stdout)
+        except (subprocess.CalledProcessError, json.JSONDecodeError, OSError):
+            return None
+
+    def _get_session(self) -> requests.Session:
+        """Return the calling thread's keepalive session for manifest downloads."""
+        session = getattr(self._thread_local, "session", None)
+        if session is None:
+            session = requests.Session()
+            self._thread_local.session = session
+            with self._sessions_lock:
+                self._sessions.append(session)
+        return session
+
+    def close(self) -> None:
+        """Finish background manifest fetches, save new manifests and release resources."""
+        if self._clone_pool is not None:
+            # Running fetches still use their sessions and the temp directory
+            self._clone_pool.shutdown(wait=True, cancel_futures=True)
+            self._clone_pool = None
+        self._clone_futures.clear()
+        self._save_persistent_manifests()
+
+        with self._sessions_lock:
+            for session in self._sessions:
+                session.close()
+            self._sessions.clear()
+        self._thread_local = threading.local()
+
+        if self._owns_temp_dir:
+            shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def is_satisfied_by(self, requirement, candidate: Candidate) -> bool:
         """
         Check if a candidate version satisfies a requirement.
 
         Args:
             requirement: Requirement object or identifier
-            candidate: Candidate string in format "identifier@version"
+            candidate: Candidate to check
 
         Returns:
             True if candidate satisfies requirement
         """
-        # Extract identifier and version from candidate
-        if "@" not in candidate:
-            return False
-        
-        candidate_identifier, candidate_version = candidate.split("@", 1)
-        
         # Get requirement identifier and spec
         if isinstance(requirement, Requirement):
             req_identifier = requirement.identifier
@@ -353,17 +689,42 @@ class PluginProvider:
         else:
             req_identifier = str(requirement)
             req_spec = self._requirement_specs.get(req_identifier, "*")
-        
-        # Check identifier matches
-        if candidate_identifier != req_identifier:
-            return False
-        
-        # Check version satisfies spec
-        try:
-            version = semver.Version.parse(candidate_version)
-            return self._satisfies_version(version, req_spec)
-        except ValueError:
-            return False
+
+        return candidate.identifier == req_identifier and self._satisfies_version(candidate.parsed, req_spec)
+
+
+def _dependency_order(graph, mapping: Mapping[str, Any]) -> List[str]:
+    """
+    Order resolved identifiers so that each one follows everything it depends on.
+
+    Depth-first post-order over the resolver's dependency graph, visiting children in
+    sorted order so the result is stable. Cycles are broken at the first revisit.
+
+    Args:
+        graph: resolvelib result graph (edges point from dependent to dependency)
+        mapping: resolvelib result mapping of identifier to candidate
+
+    Returns:
+        List of identifiers in install order
+    """
+    order: List[str] = []
+    visited = set()
+    for root in sorted(mapping):
+        if root in visited:
+            continue
+        visited.add(root)
+        stack = [(root, iter(sorted(c for c in graph.iter_children(root) if c in mapping)))]
+        while stack:
+            node, children = stack[-1]
+            for child in children:
+                if child not in visited:
+                    visited.add(child)
+                    stack.append((child, iter(sorted(c for c in graph.iter_children(child) if c in mapping))))
+                    break
+            else:
+                stack.pop()
+                order.append(node)
+    return order
 
 
 class DependencyResolver:
@@ -381,19 +742,32 @@ class DependencyResolver:
         self.project_dir = project_dir
         self.provider = PluginProvider(registry, project_dir)
 
-    def resolve(self, requirements: Dict[str, str]) -> Dict[str, str]:
+    def resolve(
+        self, requirements: Dict[str, str], locked: Optional[Dict[str, Dict[str, Any]]] = None
+    ) -> Dict[str, str]:
         """
         Resolve dependencies for a set of requirements.
 
         Args:
             requirements: Dict mapping plugin slugs to version specs
+            locked: Dict mapping plugin slugs to lockfile entries ("version" and optionally
+                "dependencies") whose versions are kept when they still satisfy
 
         Returns:
-            Dict mapping plugin slugs to resolved versions
+            Dict mapping plugin slugs to resolved versions, ordered so that every
+            plugin comes after its dependencies
 
         Raises:
             resolvelib.resolvers.ResolutionImpossible: If dependencies cannot be resolved
         """
+        locked = locked or {}
+        self.provider.locked_versions = {slug: entry["version"] for slug, entry in locked.items()}
+        self.provider.locked_dependencies = {
+            slug: entry["dependencies"]
+            for slug, entry in locked.items()
+            if isinstance(entry.get("dependencies"), dict)
+        }
+
         # Create resolver
         reporter = resolvelib.BaseReporter()
         resolver = resolvelib.Resolver(self.provider, reporter)
@@ -405,24 +779,14 @@ class DependencyResolver:
             req_list.append(Requirement(identifier, spec))
 
         # Resolve
-        result = resolver.resolve(req_list)
-
-        # Extract resolutions
-        resolutions: Dict[str, str] = {}
-        for requirement, candidate in result.mapping.items():
-            # requirement is the identifier, candidate is "identifier@version"
-            if isinstance(requirement, Requirement):
-                identifier = requirement.identifier
-            else:
-                identifier = str(requirement)
-            
-            # Extract version from candidate
-            if "@" in candidate:
-                _, version = candidate.split("@", 1)
-            else:
-                version = candidate
-            
-            resolutions[identifier] = version
-
-        return resolutions
+        try:
+            result = resolver.resolve(req_list)
+        finally:
+            self.provider.close()
+
+        # Extract resolutions, dependencies before dependents
+        return {
+            identifier: result.mapping[identifier].version
+            for identifier in _dependency_order(result.graph, result.mapping)
+        }
 
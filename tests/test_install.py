@@ -0,0 +1,133 @@
+"""Tests for the install command's lockfile handling."""
+
+import argparse
+import json
+
+import pytest
+
+from mesh_plugin_manager.commands import install
+from mesh_plugin_manager.installer import PluginInstaller
+from mesh_plugin_manager.registry import RegistryClient
+
+REGISTRY = {
+    "p1": {"version": "1.0.0", "repo": "https://example.invalid/p1.git", "dependencies": {"p2": "^2.0.0"}},
+    "p2": {"version": "2.0.0", "repo": "https://example.invalid/p2.git", "dependencies": {}},
+}
+
+LOCKFILE = {
+    "plugins": {
+        "p1": {
+            "version": "1.0.0",
+            "repo": "https://example.invalid/p1.git",
+            "resolved": "sha-p1",
+            "dependencies": {"p2": "^2.0.0"},
+        },
+        "p2": {
+            "version": "2.0.0",
+            "repo": "https://example.invalid/p2.git",
+            "resolved": "sha-p2",
+            "dependencies": {},
+            "transitive": True,
+        },
+    }
+}
+
+
+class FakeInstaller:
+    """Stands in for PluginInstaller with fixed checkout commits."""
+
+    def __init__(self, commits):
+        self.commits = commits
+
+    def is_plugin_installed(self, slug):
+        return slug in self.commits
+
+    def get_plugin_commit(self, slug):
+        return self.commits.get(slug)
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    """A project with p1 (and transitively p2) installed at their locked commits."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    (tmp_path / "meshtastic.json").write_text(json.dumps({"name": "fw", "plugins": {"p1": "^1.0.0"}}))
+    (tmp_path / "meshtastic-lock.json").write_text(json.dumps(LOCKFILE))
+    for slug in ("p1", "p2"):
+        (tmp_path / "plugins" / slug / "src").mkdir(parents=True)
+    monkeypatch.setattr(install, "find_project_dir", lambda: str(tmp_path))
+
+    commits = {"p1": "sha-p1", "p2": "sha-p2"}
+    monkeypatch.setattr(PluginInstaller, "get_plugin_commit", lambda self, slug: commits.get(slug))
+
+    fetches = []
+
+    def fetch_registry(self, force_refresh=False, use_cache=True):
+        fetches.append(force_refresh)
+        return REGISTRY
+
+    monkeypatch.setattr(RegistryClient, "fetch_registry", fetch_registry)
+
+    cloned = []
+
+    def install_plugins_bulk(self, plugins, max_workers=None):
+        for slug, _, _, _ in plugins:
+            cloned.append(slug)
+            yield True, f"new-{slug}", []
+
+    monkeypatch.setattr(PluginInstaller, "install_plugins_bulk", install_plugins_bulk)
+    return tmp_path, commits, fetches, cloned
+
+
+def _args(**overrides):
+    values = {"plugins": [], "link": False, "jobs": 1, "no_cache": False, "force": False}
+    values.update(overrides)
+    return argparse.Namespace(**values)
+
+
+def test_satisfied_lockfile_skips_registry(project, capsys):
+    _, _, fetches, _ = project
+
+    install.cmd_install(_args())
+
+    assert fetches == []
+    assert "All plugins are installed at their locked versions." in capsys.readouterr().out
+
+
+def test_force_resolves_even_when_lockfile_satisfies(project):
+    _, _, fetches, _ = project
+
+    install.cmd_install(_args(force=True))
+
+    assert fetches == [True]
+
+
+def test_up_to_date_plugins_are_not_cloned(project):
+    project_dir, commits, _, cloned = project
+    commits["p2"] = "moved"
+
+    install.cmd_install(_args())
+
+    assert cloned == ["p2"]
+    lockfile = json.loads((project_dir / "meshtastic-lock.json").read_text())
+    assert lockfile["plugins"]["p1"]["resolved"] == "sha-p1"
+    assert lockfile["plugins"]["p2"]["resolved"] == "new-p2"
+
+
+def test_transitive_commit_drift_forces_resolve():
+    installer = FakeInstaller({"p1": "sha-p1", "p2": "moved"})
+
+    assert not install._lockfile_satisfies({"p1": "^1.0.0"}, LOCKFILE["plugins"], installer)
+
+
+def test_transitive_version_drift_forces_resolve():
+    locked = json.loads(json.dumps(LOCKFILE["plugins"]))
+    locked["p2"]["version"] = "1.0.0"
+    installer = FakeInstaller({"p1": "sha-p1", "p2": "sha-p2"})
+
+    assert not install._lockfile_satisfies({"p1": "^1.0.0"}, locked, installer)
+
+
+def test_matching_lockfile_satisfies():
+    installer = FakeInstaller({"p1": "sha-p1", "p2": "sha-p2"})
+
+    assert install._lockfile_satisfies({"p1": "^1.0.0"}, LOCKFILE["plugins"], installer)
@@ -0,0 +1,79 @@
+"""Tests for skipping up-to-date protobuf generation."""
+
+import os
+import time
+
+import pytest
+
+from mesh_plugin_manager import proto
+
+
+@pytest.fixture
+def protos(tmp_path):
+    """A proto with an options file that imports a second proto, all dated in the past."""
+    (tmp_path / "a.proto").write_text('syntax = "proto3";\nimport "nanopb.proto";\nimport "b.proto";\n')
+    (tmp_path / "a.options").write_text("A.name max_size:16\n")
+    (tmp_path / "b.proto").write_text('syntax = "proto3";\n')
+    past = time.time() - 100
+    for name in ("a.proto", "a.options", "b.proto"):
+        os.utime(tmp_path / name, (past, past))
+    return tmp_path
+
+
+@pytest.fixture
+def nanopb_runs(monkeypatch):
+    """Replace nanopb_generator with a stub that writes both outputs and records each run."""
+    runs = []
+
+    def run(cmd, cwd=None, **kwargs):
+        output_dir, proto_file = cmd[cmd.index("-D") + 1], cmd[-1]
+        name = os.path.splitext(os.path.basename(proto_file))[0]
+        for ext in (".h", ".cpp"):
+            with open(os.path.join(output_dir, f"{name}.pb{ext}"), "w") as f:
+                f.write("// generated\n")
+        runs.append(proto_file)
+
+    monkeypatch.setattr(proto.subprocess, "run", run)
+    return runs
+
+
+def _touch(path):
+    future = time.time() + 100
+    os.utime(path, (future, future))
+
+
+def test_inputs_follow_imports(protos):
+    proto_file = str(protos / "a.proto")
+    options_file = str(protos / "a.options")
+
+    assert proto._proto_inputs(proto_file, options_file, str(protos)) == [
+        proto_file,
+        options_file,
+        str(protos / "b.proto"),
+    ]
+
+
+def test_up_to_date_outputs_are_skipped(protos, nanopb_runs):
+    messages = []
+
+    assert proto.generate_protobuf_files(str(protos / "a.proto"), log=messages.append)
+    assert proto.generate_protobuf_files(str(protos / "a.proto"), log=messages.append)
+
+    assert len(nanopb_runs) == 1
+    assert messages[-1] == "Protobuf files for a.proto are up to date"
+
+
+@pytest.mark.parametrize("changed", ["a.proto", "a.options", "b.proto"])
+def test_changed_input_regenerates(protos, nanopb_runs, changed):
+    proto.generate_protobuf_files(str(protos / "a.proto"), log=lambda message: None)
+    _touch(protos / changed)
+
+    assert proto.generate_protobuf_files(str(protos / "a.proto"), log=lambda message: None)
+    assert len(nanopb_runs) == 2
+
+
+def test_force_always_regenerates(protos, nanopb_runs):
+    proto.generate_protobuf_files(str(protos / "a.proto"), log=lambda message: None)
+
+    assert proto.generate_protobuf_files(str(protos / "a.proto"), force=True, log=lambda message: None)
+    assert len(nanopb_runs) == 2
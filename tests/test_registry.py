@@ -0,0 +1,96 @@
+"""Tests for registry caching and revalidation."""
+
+import json
+import os
+import time
+
+import pytest
+import requests
+
+from mesh_plugin_manager.registry import RegistryClient
+
+CACHED = {"p1": {"version": "1.0.0"}}
+FRESH = {"p1": {"version": "1.1.0"}}
+
+
+class FakeResponse:
+    """Minimal stand-in for requests.Response."""
+
+    def __init__(self, status_code, content=b"", headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} error")
+
+
+@pytest.fixture
+def client(tmp_path):
+    """A client with a stale cached registry and saved validators."""
+    client = RegistryClient(cache_dir=str(tmp_path))
+    client.cache_file.write_text(json.dumps(CACHED))
+    client.cache_validators_file.write_text(json.dumps({"etag": '"v1"', "last_modified": None}))
+    stale = time.time() - 2 * RegistryClient.CACHE_DURATION
+    os.utime(client.cache_file, (stale, stale))
+    return client
+
+
+def _stub_get(monkeypatch, client, result):
+    """Replace the client's HTTP GET, recording the headers of each request."""
+    requests_made = []
+
+    def get(url, headers=None, timeout=None):
+        requests_made.append(headers)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    monkeypatch.setattr(client._session, "get", get)
+    return requests_made
+
+
+def test_not_modified_reuses_cache_and_refreshes_mtime(client, monkeypatch):
+    requests_made = _stub_get(monkeypatch, client, FakeResponse(304))
+
+    assert client.fetch_registry() == CACHED
+    assert requests_made == [{"If-None-Match": '"v1"'}]
+    assert client._is_cache_valid()
+    assert json.loads(client.cache_file.read_text()) == CACHED
+
+
+def test_ok_rewrites_cache_and_validators(client, monkeypatch):
+    raw = json.dumps(FRESH).encode()
+    headers = {"ETag": '"v2"', "Last-Modified": "Wed, 14 Oct 2026 00:00:00 GMT"}
+    _stub_get(monkeypatch, client, FakeResponse(200, raw, headers))
+
+    assert client.fetch_registry() == FRESH
+    assert client.cache_file.read_bytes() == raw
+    assert client._is_cache_valid()
+    assert client._read_validators() == {
+        "If-None-Match": '"v2"',
+        "If-Modified-Since": "Wed, 14 Oct 2026 00:00:00 GMT",
+    }
+
+
+def test_network_error_falls_back_to_stale_cache(client, monkeypatch):
+    _stub_get(monkeypatch, client, requests.ConnectionError("offline"))
+
+    assert client.fetch_registry() == CACHED
+    assert not client._is_cache_valid()
+
+
+def test_network_error_without_cache_raises(client, monkeypatch):
+    _stub_get(monkeypatch, client, requests.ConnectionError("offline"))
+
+    with pytest.raises(requests.ConnectionError):
+        client.fetch_registry(use_cache=False)
+
+
+def test_fresh_cache_skips_request(client, monkeypatch):
+    os.utime(client.cache_file, None)
+    requests_made = _stub_get(monkeypatch, client, FakeResponse(500))
+
+    assert client.fetch_registry() == CACHED
+    assert requests_made == []
@@ -0,0 +1,54 @@
+"""Tests for the dependency resolver."""
+
+import pytest
+from resolvelib.structs import DirectedGraph
+
+from mesh_plugin_manager.resolver import DependencyResolver, _dependency_order
+
+REGISTRY = {
+    "p1": {"version": "1.2.0", "repo": "https://example.invalid/p1.git", "dependencies": {}},
+}
+
+
+@pytest.fixture(autouse=True)
+def cache_home(tmp_path, monkeypatch):
+    """Keep the persistent manifest cache out of the real user cache."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+
+
+def test_locked_version_kept_when_spec_allows_it(tmp_path):
+    locked = {"p1": {"version": "1.0.0", "dependencies": {}}}
+    resolver = DependencyResolver(REGISTRY, str(tmp_path))
+
+    assert resolver.resolve({"p1": "^1.0.0"}, locked=locked) == {"p1": "1.0.0"}
+
+
+def test_locked_version_dropped_when_spec_excludes_it(tmp_path):
+    locked = {"p1": {"version": "1.0.0", "dependencies": {}}}
+    resolver = DependencyResolver(REGISTRY, str(tmp_path))
+
+    assert resolver.resolve({"p1": "^1.2.0"}, locked=locked) == {"p1": "1.2.0"}
+
+
+def _graph(edges):
+    """Build a resolvelib graph from (dependent, dependency) pairs."""
+    graph = DirectedGraph()
+    for node in {node for edge in edges for node in edge}:
+        graph.add(node)
+    for dependent, dependency in edges:
+        graph.connect(dependent, dependency)
+    return graph
+
+
+def test_dependency_order_diamond():
+    edges = [("app", "left"), ("app", "right"), ("left", "base"), ("right", "base")]
+    mapping = dict.fromkeys(["app", "left", "right", "base"])
+
+    assert _dependency_order(_graph(edges), mapping) == ["base", "left", "right", "app"]
+
+
+def test_dependency_order_breaks_cycles():
+    edges = [("a", "b"), ("b", "a"), ("c", "a")]
+    mapping = dict.fromkeys(["a", "b", "c"])
+
+    assert _dependency_order(_graph(edges), mapping) == ["b", "a", "c"]